@@ -6,27 +6,28 @@ import asyncio
 import discord
 from discord.ext import commands, voice_recv
 from dotenv import load_dotenv
-from datetime import datetime
-from openai import OpenAI
-import whisper
+from radio_pipeline import stream_to_voice
+from playback import RadioScheduler, DRIVER, SAFETY, FUEL, LAP, BANTER
 #import edge_tts
-from discord import FFmpegPCMAudio
-from pydub import AudioSegment, effects
+from pydub import AudioSegment
 import aiohttp
 import async_timeout
-from telemetry_server import TelemetryServer
-from pydub.effects import low_pass_filter, high_pass_filter
-from pydub.generators import WhiteNoise
-from TTS.api import TTS
-from gt_telem import TurismoClient
-from gt_telem.events import GameEvents, RaceEvents
-import re
+from telemetry_server import TelemetryServer, STALE_AFTER
+from voice_capture import UtteranceSink, SAMPLE_RATE
+from stt_service import SttService, TriggerSpotter
+from radio_filter import FILTERS, apply_radio_filter, filter_settings, float_to_segment
+from audio_cache import AudioCache, cache_key
+from tts_worker import TtsWorkerPool, TtsWorkerError
+from startup import Startup
+from prompt_builder import PromptBuilder, lap_time
+from phrasebank import Phrasebank
+from speculation import Speculator, seconds_to_fuel, seconds_to_lap_end
+from telemetry_recorder import SessionRecorder
+import latency
 import re
+import json
 import inflect
-from faster_whisper import WhisperModel
-import os
 import time
-import subprocess
 
 # allow duplicate OpenMP runtimes (unsafe, but gets you running)
 os.environ["KMP_DUPLICATE_LIB_OK"] = "TRUE"
@@ -39,217 +40,448 @@ p = inflect.engine()
 # Driver Name
 driver_name = "Luca Collins"
 TRIGGER_PHRASE = "radio|really|video"
-
-# MAIN PROMPT 
-MAIN_PROMPT =  (
-    f"You are a witty and snarky British formula 1 engineer for a driver named  {driver_name}. "
-    f"You speak in short sentences, and don't waste time while racing. Do not use emojis or symbols. {driver_name} is your friend so bantar is welcome"
-    f"Just ensure to end on a punctuation always and speak in concise, complete sentences."
-    )
+# speak LLM replies sentence by sentence while they are still being generated
+STREAM_REPLIES = True
+TTS_MODEL_NAME = "tts_models/en/vctk/vits"
+TTS_SPEAKER = "p226"
+TTS_WORKERS = 1
+# rendered radio lines: in-memory LRU budget + optional on-disk tier (None to disable)
+AUDIO_CACHE_BYTES = 64 * 1024 * 1024
+AUDIO_CACHE_DIR = "tts_cache"
+
+# fixed lines – pre-rendered in the background at startup
+CANNED_LINES = {
+    "intro_start": "Engineer here — radio check, good luck out there!",
+    "race_finish": "Solid stint – see you in the garage, we’ll debrief later.",
+    "radio_check": "Loud and clear. Standing by for your next instruction.",
+    "say_again": "Say again, radio's breaking up.",
+}
+# fuel / position / best-lap callouts from pre-rendered templates instead of the LLM
+PHRASEBANK = True
+FUEL_ALERT_LEVELS = (50, 20, 10)
+# start generating lap updates (and LLM fuel alerts) this many seconds before they are due
+SPECULATE = True
+SPECULATE_LEAD_S = 6.0
+# playback class of each callout (DRIVER > SAFETY > FUEL > LAP > BANTER)
+CALLOUT_PRIORITY = {
+    "engineer_response": DRIVER,
+    "message_received": DRIVER,
+    "fuel_critical": SAFETY,       # the last FUEL_ALERT_LEVELS alert
+    "race_finish": SAFETY,
+    "fuel": FUEL,
+    "lap_update": LAP,
+    "intro_start": LAP,
+    "overtake": BANTER,
+}
+# engineer stages: phrases waiting for STT, callouts waiting for the LLM, LLM calls at once
+UTTERANCE_QUEUE = 2
+DECISION_QUEUE = 8
+DECISION_WORKERS = 3
+# per-stage latency histograms (print with !latency); off = near-zero overhead
+LATENCY_TRACING = True
+# every packet of the session goes to a memory-mappable file here (None to disable)
+SESSION_DIR = "sessions"
+# "numpy" (one vectorized pass) or "pydub" (the original step-by-step chain)
+RADIO_FILTER = "numpy"
+radio_filter = FILTERS[RADIO_FILTER]
+latency.enable(LATENCY_TRACING)
+
+# persona + format rules: one byte-identical system prompt for every callout
+prompts = PromptBuilder(driver_name)
 
 
-class QuietFFmpegPCMAudio(FFmpegPCMAudio):
-    def __init__(self, source, **kwargs):
-        if 'before_options' not in kwargs:
-            kwargs['before_options'] = ''
-        if 'options' not in kwargs:
-            kwargs['options'] = '-vn'
         
-        # Inject creationflags to suppress console window on Windows
-        self.creationflags = subprocess.CREATE_NO_WINDOW
-        
-        super().__init__(source, **kwargs)
-        
-def apply_radio_filter(audio: AudioSegment) -> AudioSegment:
-    # Step 1: Extremely narrow bandpass to simulate walkie-talkie frequency
-    filtered = high_pass_filter(audio, cutoff=500)
-    filtered = low_pass_filter(filtered, cutoff=3000)
 
-    # Step 2: Add brutal compression to flatten dynamics
-    filtered = effects.compress_dynamic_range(filtered, threshold=-30.0, ratio=10.0)
 
-    # Step 3: Bitcrush simulation (reduce bitrate fidelity)
-    filtered = filtered.set_sample_width(1)  # reduce to 8-bit depth
 
-    # Step 4: Add stronger static for a gritty texture
-    noise = WhiteNoise().to_audio_segment(duration=len(filtered), volume=-60)
-    filtered = filtered.overlay(noise)
+# ─── Setup ─────────────────────────────────────────────
+load_dotenv()
+TOKEN = os.getenv("DISCORD_TOKEN")
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
-    # Step 5: Apply band-limited EQ feel (resample to 8000 Hz)
-    filtered = filtered.set_frame_rate(8000).set_channels(1)
-    filtered = effects.normalize(filtered)
+# ─── Lazy startup ──────────────────────────────────────
+# Nothing heavy loads at import time. start_background_loading() loads every
+# capability in parallel (while the launcher looks for the PS5); each one is
+# gated on its own via `.loaded` / `await x.wait_loaded()`.
+startup = Startup()
 
-    return filtered
 
+def _load_llm():
+    from llm_client import LlmClient    # openai + httpx are slow to import
+    # one pooled async client for every callout – never blocks the event loop
+    return LlmClient(api_key=OPENAI_API_KEY)
 
 
-# ─── Setup ─────────────────────────────────────────────
-load_dotenv()
-TOKEN = os.getenv("DISCORD_TOKEN")
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-client = OpenAI(api_key=OPENAI_API_KEY)
+def _load_stt():
+    # faster-whisper lives on its own warmed-up worker thread
+    service = SttService(compute_type="int8").start()
+    service.wait_ready()
+    return service
+
+
+def _load_tts():
+    # Coqui VITS runs in its own warmed-up process(es), never on the event loop
+    pool = TtsWorkerPool(model_name=TTS_MODEL_NAME, speaker=TTS_SPEAKER, workers=TTS_WORKERS).start()
+    if not pool.wait_ready():
+        raise TtsWorkerError("TTS workers did not come up")
+    return pool
+
+
+class RadioAssets:
+    """Radio clicks and chirps, pre-converted to Discord PCM."""
+
+    def __init__(self):
+        pssh = AudioSegment.from_file("Radio/Start.FLAC")[:500]  # last 500ms of static
+        end = AudioSegment.from_file("Radio/End1.wav")[:500]  # last 500ms of static
+        pssh = pssh.set_channels(1).apply_gain(-8)
+        self.click_in = to_discord_pcm(end)
+        self.click_out = to_discord_pcm(pssh)
+        # "message received" chirp, decoded once at -14 dB (the old ffmpeg volume=0.2)
+        self.message_received = (
+            to_discord_pcm(AudioSegment.from_file("Message_Received.wav").apply_gain(-14))
+            if os.path.exists("Message_Received.wav") else None
+        )
+
+
+llm = startup.lazy("llm", _load_llm)
+stt = startup.lazy("stt", _load_stt)
+tts_pool = startup.lazy("tts", _load_tts)
+radio_assets = startup.lazy("radio_assets", RadioAssets)
+trigger_spotter = TriggerSpotter(stt, TRIGGER_PHRASE)
 
-#model = whisper.load_model("small")
-model = WhisperModel("tiny", compute_type='int8')
+
+def start_background_loading():
+    """Kick off every loader at once; returns the Startup for timing/reporting."""
+    startup.start_all()
+    return startup
 
 bot = commands.Bot(command_prefix="!", intents=discord.Intents.all())
 
 os.makedirs("recordings", exist_ok=True)
-os.makedirs("tts", exist_ok=True)
 
 
 # ___ Radio ________________
 #telemetry = TelemetryServer()
 #telemetry.start()
-prev_lap = None
-has_initialized_position = False
-last_fuel_alert = 100
-prev_position = None          # for overtake detection
-last_pos_call = 0             # throttle radio spam (seconds)
-prev_best_ms  = None          # track best‑lap improvement
-race_started = False    # becomes True on on_race_start
-radio_paused = True     # start muted until race actually begins
 voice_conn   = None     # populated once we have the Discord VC
-announced_fuel_levels = set()
+session      = None     # RaceSession on voice_conn (race state, stages, playback)
 # ─── TTS and Transcription ─────────────────────────────
 
-pssh = AudioSegment.from_file("Radio/Start.FLAC")[:500]  # last 500ms of static
-end = AudioSegment.from_file("Radio/End1.wav")[:500]  # last 500ms of static
-pssh = pssh.set_channels(1).apply_gain(-8)
+async def tts_segment(text, timeout_sec=10):
+    """Coqui TTS straight into a mono AudioSegment – no temp file."""
+    text = re.sub(r"P(\d+)", replace_p_with_words, text)
+    pool = await tts_pool.wait_loaded(timeout_sec)
+    with latency.span("tts"):
+        wav, rate = await pool.synthesize(text, timeout=timeout_sec)
+    return float_to_segment(wav, rate)
 
-# Load Model
-TTS_MODEL = TTS(model_name="tts_models/en/vctk/vits")
 
+def to_discord_pcm(audio: AudioSegment) -> bytes:
+    """48 kHz stereo s16 – what discord.AudioSource.read() has to hand out."""
+    return audio.set_frame_rate(48000).set_channels(2).set_sample_width(2).raw_data
+
+
+async def render_radio_pcm(text, timeout_sec=10):
+    """One sentence -> TTS worker -> radio filter -> Discord PCM."""
+    speech = await tts_segment(text, timeout_sec)
+    trace = latency.current()     # executor threads don't inherit the context
+
+    def finish():
+        with trace.span("radio_filter"):
+            radio = radio_filter(speech)
+        with trace.span("encode"):
+            return to_discord_pcm(radio)
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, finish)
+
+
+audio_cache = AudioCache(max_bytes=AUDIO_CACHE_BYTES, disk_dir=AUDIO_CACHE_DIR)
+
+
+def line_key(text):
+    return cache_key(text, TTS_SPEAKER, filter_settings(RADIO_FILTER))
+
+
+async def prerender_lines(lines):
+    """Fill the cache with the fixed lines so they play instantly. Runs as a background task."""
+    for text in lines:
+        key = line_key(text)
+        if key not in audio_cache:
+            try:
+                pcm = await render_radio_pcm(text, timeout_sec=60)   # first one may wait for warm-up
+            except Exception as e:
+                print(f"⚠️ Could not pre-render {text!r}: {e}")
+                continue
+            assets = await radio_assets.wait_loaded()
+            audio_cache.put(key, assets.click_in + pcm + assets.click_out)
+    print(f"📼 Pre-rendered {len(lines)} radio lines – cache {audio_cache.stats()}")
+
+
+async def fragment_pcm(text):
+    """A phrasebank fragment as radio PCM (no clicks), rendered once and kept on disk."""
+    key = cache_key(text, TTS_SPEAKER, {**filter_settings(RADIO_FILTER), "clip": "fragment"})
+    pcm = audio_cache.get(key)
+    if pcm is None:
+        pcm = await render_radio_pcm(text, timeout_sec=60)
+        audio_cache.put(key, pcm)
+    return pcm
+
+
+phrasebank = Phrasebank(fragment_pcm)
+
+
+async def prerender_phrasebank():
+    """Render every phrasebank fragment ahead of the race. Runs as a background task."""
+    texts = phrasebank.fragments(fuel_levels=FUEL_ALERT_LEVELS)
+    for text in texts:
+        try:
+            await fragment_pcm(text)
+        except Exception as e:
+            print(f"⚠️ Could not pre-render fragment {text!r}: {e}")
+    print(f"📼 Phrasebank ready ({len(texts)} fragments) – cache {audio_cache.stats()}")
+
+
+async def synthesize_response(text, cache_tag="engineer", retries=3, timeout_sec=10):
+    """Render a full radio line ([click][speech][static]) to Discord PCM in memory."""
+    key = line_key(text)
+    cached = audio_cache.get(key)
+    if cached is not None:
+        return cached
 
-async def synthesize_response(text, filename="engineer", retries=3, timeout_sec=10):
-    text = re.sub(r"P(\d+)",replace_p_with_words,text)
-    path = f"tts/{filename}.mp3"
-    
     for attempt in range(retries):
         try:
             print(f"🗣️ TTS attempt {attempt + 1}...")
 
             async with async_timeout.timeout(timeout_sec):
                 #communicate = edge_tts.Communicate(text=text, voice="en-GB-RyanNeural")
-                TTS_MODEL.tts_to_file(text=text,speaker="p226", file_path=path)
-                #await communicate.save(path)
-            
-            # Make sure file exists before editing
-            if not os.path.exists(path):
-                raise FileNotFoundError("TTS output file not found after generation.")
-            
-            # Speed up playback
-            audio = AudioSegment.from_file(path)
-            #faster = audio.speedup(playback_speed=1.15)
-            audio = audio.set_channels(1)
-            radio_voice = apply_radio_filter(audio)
-            # Combine: [pssh][speech][pssh]
-            radio_audio =  end + radio_voice+pssh
-
-            # Export
-            radio_audio.export(path, format="mp3")
+                radio_voice = await render_radio_pcm(text, timeout_sec)
+                assets = await radio_assets.wait_loaded(timeout_sec)
 
-    
-            #faster.export(path, format="mp3")
+            pcm = assets.click_in + radio_voice + assets.click_out
+            audio_cache.put(key, pcm, persist=False)   # one-off LLM lines stay in RAM only
+            return pcm
 
-            return path
-        
-        except (aiohttp.ClientConnectorError, FileNotFoundError, TimeoutError) as e:
-            print(f"❌ TTS attempt {attempt + 1} failed: {e}")
+        except (aiohttp.ClientConnectorError, TimeoutError, TtsWorkerError) as e:
+            workers = tts_pool.stats() if tts_pool.loaded else "TTS not loaded"
+            print(f"❌ TTS attempt {attempt + 1} failed ({cache_tag}): {e!r} – {workers}")
             await asyncio.sleep(1)  # Short delay before retry
 
     print("❌ All TTS attempts failed. No audio response will be played.")
     return None
 
     
-async def transcribe_audio(path):
-    if not os.path.exists(path) or os.path.getsize(path) < 1000:
-        print(f"⚠️ Skipping empty or invalid audio file: {path}")
+async def transcribe_audio(path, kind="query"):
+    """Transcribe a 16 kHz mono float32 NumPy buffer (a WAV path also works)."""
+    if isinstance(path, str):
+        if not os.path.exists(path) or os.path.getsize(path) < 1000:
+            print(f"⚠️ Skipping empty or invalid audio file: {path}")
+            return ""
+    elif len(path) < SAMPLE_RATE // 10:
+        print("⚠️ Skipping empty utterance")
         return ""
 
+    if not stt.loaded:
+        print("⚠️ Speech recognition still loading")
+        return ""
     try:
-        loop = asyncio.get_event_loop()
-        #result = await loop.run_in_executor(None, lambda: model.transcribe(path))
-        #return result["text"].strip().lower()
-        #return result["text"].strip().lower()
-        segments, info = await loop.run_in_executor(None, lambda: model.transcribe(path, beam_size=5, language="en"))
-        text = " ".join([seg.text for seg in segments])
-        return text.strip().lower()
+        with latency.span("stt"):
+            return await stt.transcribe(path, kind=kind)
     except Exception as e:
-        print(f"❌ Failed to transcribe {path}: {e}")
+        print(f"❌ Failed to transcribe: {e}")
         return ""
     
 
 
 
 def starts_with_trigger(text):
-    return re.match("radio|really|video", text.strip().lower())
+    return re.match(TRIGGER_PHRASE, text.strip().lower())
 
-def ms_to_min_sec(ms: int) -> tuple[int, int]:
-    """Return (minutes, seconds) for a duration given in milliseconds."""
-    seconds_total = ms // 1000               # drop the milliseconds part
-    minutes, seconds = divmod(seconds_total, 60)
-    return (f"{minutes} minutes and {seconds} seconds")  
 
+#  Prompt for one callout: static system prompt + compact telemetry line + task
+def callout_messages(kind, task):
+    t = telemetry.get_latest()      # one immutable snapshot, so every field is from the same packet
+    if t and t.is_stale(STALE_AFTER):
+        t = None
+    fuel_per_lap = telemetry.history.fuel_per_lap() if t else None
+    return prompts.messages(kind, t, task, fuel_per_lap)
 
-def to_milliseconds(time_str: str) -> int:
-    """
-    Convert strings like '3 minutes and 17 seconds' to milliseconds.
-    """
-    # 1. Pull out the numbers with a simple regex
-    match = re.fullmatch(r'\s*(\d+)\s+minutes?\s+and\s+(\d+)\s+seconds?\s*', time_str)
-    if not match:
-        raise ValueError(f"Unsupported format: {time_str}")
-    
-    minutes, seconds = map(int, match.groups())
-
-    # 2. Convert to ms
-    return (minutes * 60 + seconds) * 1000
-#  Latest telemetry data:
-def latest_telemetry_data():
-    t = telemetry.get_latest()
-    if not t:
-        return None
 
-    curr_lap    = t.current_lap
-    total_laps  = t.total_laps
-    last_lap_ms = t.last_lap_time_ms
-
-    return {
-        "current_lap": curr_lap,
-        "position": t.race_start_pos,
-        "total_laps": total_laps,
-        "lap_time_ms": ms_to_min_sec(last_lap_ms),
-        "fuel_pct": (t.fuel_level / t.fuel_capacity) * 100,
-        "speed_kph": t.speed_mps * 3.6,
-        "engine_rpm": int(t.engine_rpm),
-        "total_cars": t.total_cars,
-        "tire_fl_temp": t.tire_fl_temp,
-        "tire_fr_temp": t.tire_fr_temp,
-        "tire_rl_temp": t.tire_rl_temp,
-        "tire_rr_temp": t.tire_rr_temp,
-        "oil_pressure": t.oil_pressure,
-        "water_temp": t.water_temp,
-        "oil_temp": t.oil_temp,
-        "best_lap_time_ms": ms_to_min_sec(t.best_lap_time_ms),   # NEW
-    }
 
 
+def radio_state(t):
+    """The parts of a packet the start / pause / finish logic reacts to."""
+    return (t.is_loading, t.is_paused, t.cars_on_track,
+            t.current_lap, t.total_laps, t.total_cars)
+
+
+def priority_for(cache_tag):
+    if cache_tag.startswith("fuel_"):
+        critical = cache_tag == f"fuel_{min(FUEL_ALERT_LEVELS)}"
+        return CALLOUT_PRIORITY["fuel_critical" if critical else "fuel"]
+    return CALLOUT_PRIORITY.get(cache_tag, LAP)
+
+
+def radio_live():
+    """True while the radio is ‘live’ (race started, not paused, connected)."""
+    return session is not None and session.live
+
+
+def enqueue(pcm, cache_tag, trace=None):
+    """Hand a finished line to the playback scheduler; returns its (outcome, seconds) future."""
+    return session.radio.submit(pcm, priority_for(cache_tag), tag=cache_tag, trace=trace)
+
 
-        
 async def play_line(vc, text, cache_tag):
-    """TTS + play, but only if radio is ‘live’"""
-    if radio_paused or not race_started or not vc or not vc.is_connected():
-        return
+    """TTS + queue for playback, but only if radio is ‘live’. Returns once queued."""
+    if not text or not radio_live():
+        return None
+    trace = latency.current() or latency.start(cache_tag)
+    try:
+        with latency.active(trace):
+            pcm = await synthesize_response(text, cache_tag=cache_tag)
+        if pcm:
+            return enqueue(pcm, cache_tag, trace)
+    except Exception as e:
+        print(f"Radio line failed ({cache_tag}): {e}")
+    return None
+
+
+
+async def play_phrase(vc, kind, cache_tag, **slots):
+    """A routine callout from the phrasebank: spliced fragment clips, no LLM."""
+    if not radio_live():
+        return None
+    trace = latency.current() or latency.start(cache_tag)
+    fragments = phrasebank.line(kind, **slots)
+    try:
+        with trace.span("phrasebank"):
+            pcm = await phrasebank.render_line(fragments)
+        assets = await radio_assets.wait_loaded()
+        enqueue(assets.click_in + pcm + assets.click_out, cache_tag, trace)
+    except Exception as e:
+        print(f"Radio line failed ({cache_tag}): {e}")
+        return None
+    return " ".join(fragments)
+
+
+async def speak_llm(vc, messages, cache_tag, kind=None):
+    """Ask the LLM and voice the reply – sentence by sentence as it streams when STREAM_REPLIES is on.
+
+    `kind` groups the prompt's token usage (default: `cache_tag`).
+    """
+    trace = latency.current() or latency.start(cache_tag)
+    with latency.active(trace):
+        return await _speak_llm(vc, messages, cache_tag, trace, kind or cache_tag)
+
+
+async def _speak_llm(vc, messages, cache_tag, trace, kind):
     try:
-        mp3 = await synthesize_response(text, filename=cache_tag)
-        if mp3:
-            vc.play(QuietFFmpegPCMAudio(mp3))
-            while vc.is_playing():
-                await asyncio.sleep(0.1)
+        client = await llm.wait_loaded(10)
+    except Exception as e:
+        print(f"Radio line failed ({cache_tag}): LLM client unavailable: {e}")
+        return None
+
+    def on_usage(usage):
+        prompts.record_usage(kind, usage)
+
+    if not STREAM_REPLIES:
+        prompts.commit(messages)
+        reply = await client.complete(messages, on_usage=on_usage)
+        trace.mark("llm_done")
+        await play_line(vc, reply, cache_tag)
+        return reply
+    if not radio_live():
+        return None
+    try:
+        assets = await radio_assets.wait_loaded(10)
+        prompts.commit(messages)
+        reply, timings = await stream_to_voice(
+            vc, client.stream(messages, on_usage=on_usage), render_radio_pcm,
+            prefix=assets.click_in, suffix=assets.click_out,
+            play=lambda source: enqueue(source, cache_tag, trace),
+        )
+        print(f"⏱️ {cache_tag}: " + ", ".join(f"{k} {v} ms" for k, v in timings.items()))
+        return reply
     except Exception as e:
         print(f"Radio line failed ({cache_tag}): {e}")
+        return None
+
 
+# ─── speculative pre-generation ───────────────────────────
+speculator = Speculator(lead_s=SPECULATE_LEAD_S)
+
+
+async def pregenerate(messages, cache_tag, kind):
+    """
+    LLM reply + rendered audio, without playing it. The audio lands in the
+    cache for play_line; returns (reply, messages) so whoever uses the reply
+    can `prompts.commit` the prompt it came from. While the driver is waiting
+    for an answer the TTS worker is theirs: the reply is kept but rendered
+    only when it is played.
+    """
+    try:
+        client = await llm.wait_loaded(10)
+        reply = await client.complete(messages, on_usage=lambda usage: prompts.record_usage(kind, usage))
+        if not reply:
+            return None
+        if session is not None and session.driver_queries:
+            return reply, messages
+        if await synthesize_response(reply, cache_tag=cache_tag) is not None:
+            return reply, messages
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        print(f"⚠️ Pre-generation failed ({cache_tag}): {e}")
+    return None
+
+
+async def claim(kind, key, signature):
+    """The pre-generated reply for this event (its prompt now committed), or None."""
+    hit = await speculator.take(kind, key, signature)
+    if hit is None:
+        return None
+    reply, messages = hit
+    prompts.commit(messages)
+    return reply
+
+
+def lap_signature(t):
+    """What a lap update is written from: if these move, a pre-generated one is stale."""
+    return t.race_start_pos, round(t.fuel_pct / 5)
+
+
+def speculate(s, latest):
+    """Start on the callouts that are due within the next few seconds."""
+    speculator.expire()
+    if s.driver_queries:
+        return      # nothing speculative competes with a driver reply for the TTS worker
+    lap, total = latest.current_lap, latest.total_laps
+    if lap >= 1 and (total == 0 or lap <= total):
+        nxt = lap + 1
+        task = lap_update_task(nxt, total) + " Don't quote lap times."
+        speculator.want(
+            "lap_update", nxt, lap_signature(latest),
+            lambda: pregenerate(callout_messages("lap_update_ahead", task), "lap_update", "lap_update"),
+            seconds_to_lap_end(latest, telemetry.history),
+        )
+    if not PHRASEBANK:
+        below = [l for l in FUEL_ALERT_LEVELS if l < int(latest.fuel_pct) and l not in s.announced_fuel_levels]
+        if below:
+            level = max(below)
+            speculator.want(
+                "fuel", level, level,
+                lambda: pregenerate(callout_messages("fuel", fuel_task(level)), f"fuel_{level}", "fuel"),
+                seconds_to_fuel(latest, level, telemetry.history.fuel_per_lap()),
+            )
+
+
+async def warm_up_llm():
+    """Open the LLM connection ahead of the first callout, once the client has loaded."""
+    try:
+        await (await llm.wait_loaded()).warm_up()
+    except Exception as e:
+        print(f"⚠️ LLM warm-up skipped: {e}")
 
 
 def replace_p_with_words(match):
@@ -258,266 +490,413 @@ def replace_p_with_words(match):
     return f"pee {word}"
    
 
-# ─── helper for overtakes ──────────────────────────────────
-async def maybe_handle_overtake(vc, latest):
-    global prev_position, last_pos_call, has_initialized_position
-    
-    curr_pos = latest.race_start_pos
+# ─── Race session ──────────────────────────────────────────
+class RaceSession:
+    """
+    One engineer session: what it remembers between packets, and the
+    queues joining its stages.
 
+    watch_telemetry ─┐
+                     ├─> decisions ─> decide (LLM / phrasebank) ─> radio (playback)
+    capture_voice ─> utterances ─> transcribe_voice ─┘
 
-    # Don't check for overtakes until after lap 2 and position is initialized
-    if not has_initialized_position:
-        if latest.current_lap >= 2:
-            prev_position = curr_pos
-            has_initialized_position = True
-        return            
-            # only after lap 2, with an 60s cooldown
-    if latest.current_lap >= 2 and prev_position is not None and curr_pos != prev_position:
-        if time.time() - last_pos_call > 45:
-            # build your prompt
-            flavour = "gained a place" if curr_pos < prev_position else "lost a place"
-            stats = latest_telemetry_data()
-            prompt =MAIN_PROMPT+ (f" The driver just {flavour} "
-                f"(from P{prev_position} to P{curr_pos}). In 10 words or fewer, quip about it. Stats for the car are: {stats}"
-                f"Be sure to also mention what place they are now in, like P one (please leave a space between the P and the number of their place). Keep things short, no more than 10 words total!"
-            )
-            msg = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "system", "content": prompt}]
-            ).choices[0].message.content
-            await play_line(vc, msg, "overtake")
-            last_pos_call = time.time()
-
-    prev_position = curr_pos
-    
-# ─── helper for lap updates ───────────────────────────────
-async def maybe_handle_lap_update(vc, latest):
-    global prev_lap
-    global prev_best_ms
-    lap = latest.current_lap
-    total = latest.total_laps
-
-    # skip lap 1 and after the race is done
-    if lap is None or lap == 1  :
-        return
-    
-    if lap==prev_lap:
-        return 
-    stats = latest_telemetry_data()
-    if ( lap > total) & (total!=0):
-        prompt = MAIN_PROMPT+(
-        f" The car stats at this moment in the race are as follows: {stats} "
-            f"The race just finished. Congratulate the driver. "
-            f"Give the driver a one or super‑short sentence update on the race, and what position they got."
-        )        
-    else:
-        prompt = MAIN_PROMPT+(
-        f" The car stats at this moment in the race are as follows: {stats} "
-            f"We are on lap {lap} of {total}. "
-            f"Give the driver a one or two super‑short sentence update."
-        )
-    if latest and latest.best_lap_time_ms != -1:
-        if prev_best_ms is None or latest.best_lap_time_ms < to_milliseconds( prev_best_ms):
-            prev_best_ms = stats["best_lap_time_ms"]
-            stats = latest_telemetry_data()
-            prompt += f" And please tell the driver they just set a new best lap of {prev_best_ms} ms. "
-    summary = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[{"role": "system", "content": prompt}]
-    ).choices[0].message.content
-    await play_line(vc, summary, "lap_update")
-    prev_lap = lap
-    
-# ─── Core Voice Handling ───────────────────────────────
+    Every stage is its own task, so a lap update no longer waits for the
+    listen window or STT, and a fuel alert no longer waits behind a lap
+    update's LLM call.
+    """
 
-async def handle_engineer_flow(vc):
+    def __init__(self, vc):
+        self.vc = vc
+        self.radio = RadioScheduler(vc)     # all playback is queued here
+        # one sink for the whole session – listening is never switched off
+        self.sink = UtteranceSink(loop=asyncio.get_running_loop())
+        self.utterances = asyncio.Queue(maxsize=UTTERANCE_QUEUE)
+        self.decisions = asyncio.Queue(maxsize=DECISION_QUEUE)
+        self.on_air = asyncio.Event()       # set while the radio is live
+        self.race_started = False           # becomes True on on_in_race
+        self.radio_paused = True            # start muted until race actually begins
+        self._slots = asyncio.Semaphore(DECISION_WORKERS)
+        self._in_flight = set()
+        self.driver_queries = set()         # traces of driver questions not answered yet
+        self.reset_race()
+
+    def reset_race(self):
+        self.prev_lap = None
+        self.prev_position = None           # for overtake detection
+        self.has_initialized_position = False
+        self.last_pos_call = 0              # throttle radio spam (seconds)
+        self.announced_fuel_levels = set()
+
+    @property
+    def live(self):
+        return self.race_started and not self.radio_paused and self.vc.is_connected()
+
+    def set_paused(self, paused):
+        self.radio_paused = paused
+        if self.live:
+            self.on_air.set()
+        else:
+            self.on_air.clear()
+
+    # ─── stages ────────────────────────────────────────────
+    async def run(self):
+        stages = [asyncio.create_task(stage(self), name=stage.__name__)
+                  for stage in (watch_telemetry, capture_voice, transcribe_voice)]
+        stages.append(asyncio.create_task(self._decide(), name="decide"))
+        try:
+            while self.vc.is_connected() and not any(task.done() for task in stages):
+                await asyncio.wait(stages, timeout=1, return_when=asyncio.FIRST_COMPLETED)
+            for task in stages:
+                if task.done() and not task.cancelled() and task.exception():
+                    raise task.exception()
+        finally:
+            pending = stages + list(self._in_flight)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            self.radio.close()
+
+    def post(self, name, handler, *args):
+        """Hand a callout to the decision stage; dropped (not queued up) if it is backed up."""
+        try:
+            self.decisions.put_nowait((name, handler, args))
+        except asyncio.QueueFull:
+            print(f"⚠️ Decision queue full – dropped {name}")
+
+    def cancel_pending(self):
+        """Pause / menu: nothing decided so far is worth saying any more."""
+        while not self.decisions.empty():
+            self.decisions.get_nowait()
+        self.driver_queries.clear()
+        for task in list(self._in_flight):
+            task.cancel()
+
+    async def _decide(self):
+        while True:
+            name, handler, args = await self.decisions.get()
+            await self._slots.acquire()
+            task = asyncio.create_task(handler(*args), name=name)
+            self._in_flight.add(task)
+            task.add_done_callback(self._decided)
+
+    def _decided(self, task):
+        self._in_flight.discard(task)
+        self._slots.release()
+        if not task.cancelled() and task.exception():
+            print(f"❌ {task.get_name()} failed: {task.exception()!r}")
+
+
+def _watch_key(t):
+    """Wake the telemetry stage when the radio state, position or fuel percent changes."""
+    return radio_state(t), t.race_start_pos, int(t.fuel_pct)
+
+
+async def watch_telemetry(s):
     """
     • Radio stays muted until we *know* the race has begun
-      (lap counter becomes 1 or higher).
+      (lap counter becomes 0 or higher).
     • Whenever GT7 reports is_loading or is_paused the radio is muted and
       any sound that is still playing is stopped immediately.
+    • While live, posts overtakes, lap updates and fuel alerts.
     """
-
-    global race_started, radio_paused, prev_lap,prev_position,prev_best_ms,last_fuel_alert,last_pos_call
-    idle_path = "recordings/idle.wav"
-
-    while vc.is_connected():
-        # ── Telemetry‑driven radio state ─────────────────────
-        # ── Telemetry‑driven radio state ─────────────────────
+    t = None
+    while s.vc.is_connected():
+        # wakes on a change we react to since the packet we last handled (at once if one
+        # landed while we were busy), or every half second for staleness / speculation
+        await telemetry.wait_for_update(key=_watch_key, timeout=0.5, since=t)
         t = telemetry.get_latest()
 
         # game is “paused / menu / loading” when …
         sim_paused = (
             t is None                          # no packet yet
+            or t.is_stale(STALE_AFTER)         # UDP stream went quiet
             or t.is_loading
             or t.cars_on_track == 0            # back in menu after race
         )
-
-        if prev_lap!=None:
-            if( t.total_laps<prev_lap) & (t.total_laps!=0):
-                sim_paused = True
+        # past the last lap: no new callouts, but the last lines still play
+        race_over = (t is not None and s.prev_lap is not None
+                     and t.total_laps != 0 and t.total_laps < s.prev_lap)
 
         # ── 0.  detect race FINISH ───────────────────────────
         # when we were in‑race and now cars disappeared or menu opened
-        if ((t.total_cars==-1) and sim_paused) :
-            await play_line(
-                vc,
-                "Solid stint – see you in the garage, we’ll debrief later.",
-                "race_finish",
-            )
-            # full reset so the next on_in_race gives a fresh intro
-            race_started  = False
-            radio_paused  = True
-            prev_lap      = None
-            prev_position = None
-            prev_best_ms  = None
-            last_fuel_alert = 100
-            print("🏁 Race finished – radio reset")
-            # do *not* return; we’ll remain in the loop waiting
-            # for the next session to start
-        
+        if s.race_started and t is not None and t.total_cars == -1 and sim_paused:
+            await play_line(s.vc, CANNED_LINES["race_finish"], "race_finish")
+            finish_race(s)
+
         # ── 1.  enter pause / menu ───────────────────────────
-        if sim_paused and not radio_paused:
-            radio_paused = True
-            if vc.is_playing():
-                vc.stop()
+        if sim_paused and not s.radio_paused:
+            s.set_paused(True)
+            s.cancel_pending()
+            s.radio.clear()
+            s.sink.reset()
             print("🔇 Radio muted (sim paused / menu)")
 
         # ── 2.  leave pause / menu (race already started) ───
-        if (not sim_paused) and radio_paused and race_started:
-            radio_paused = False
+        if (not sim_paused) and s.radio_paused and s.race_started:
+            s.set_paused(False)
+            s.sink.reset()
             print("🎙️ Radio live again")
 
         # ── 3.  “official” on_in_race trigger  ───────────────
         # GT‑telem fires on_in_race when lap counter first becomes 0.
-        if (not sim_paused) and (not race_started) and t and t.current_lap == 0:
-            race_started, radio_paused = True, False
+        if (not sim_paused) and (not s.race_started) and t.current_lap == 0:
+            s.race_started = True
+            s.set_paused(False)
             print("🟢 on_in_race detected – radio live")
-            await play_line(
-                vc,
-                "Engineer here — radio check, good luck out there!",
-                "intro_start",
-            )
+            asyncio.create_task(warm_up_llm())
+            await play_line(s.vc, CANNED_LINES["intro_start"], "intro_start")
 
-        
-        # ── 4.  still muted or waiting? – sleep & loop ───────
-        if radio_paused or not race_started:
-            await asyncio.sleep(1)
+        if not s.live or race_over:
             continue
-        
-        
-        # clear out any old recording so we only ever transcribe the new one
-        if os.path.exists(idle_path):
-            os.remove(idle_path)
-        
-        vc.stop_listening()
-        # Record short clip
-        sink = voice_recv.WaveSink(idle_path)
-        vc.listen(sink)
-        await asyncio.sleep(5)
-        vc.stop_listening()
-
-        if not os.path.exists(idle_path):
+
+        # ── 4.  telemetry-based callouts ─────────────────────
+        if SPECULATE:
+            speculate(s, t)
+        overtake = detect_overtake(s, t)
+        if overtake:
+            s.post("overtake", announce_overtake, s.vc, latency.start("overtake", origin=t.received_at), *overtake)
+        lap = detect_lap_update(s, t)
+        if lap:
+            s.post("lap_update", announce_lap_update, s.vc, latency.start("lap_update", origin=t.received_at), t, *lap)
+        level = detect_fuel(s, t)
+        if level:
+            s.post(f"fuel_{level}", announce_fuel, s.vc, latency.start("fuel", origin=t.received_at), t, level)
+
+
+def finish_race(s):
+    """Full reset so the next on_in_race gives a fresh intro."""
+    s.race_started = False
+    s.set_paused(True)
+    s.reset_race()
+    telemetry.history.clear()
+    prompts.reset()
+    speculator.reset()
+    print("🏁 Race finished – radio reset")
+    print(f"🎧 Trigger spotting: {trigger_spotter.stats()}")
+    print(f"📼 Audio cache: {audio_cache.stats()}")
+    if tts_pool.loaded:
+        print(f"🗣️ TTS workers: {tts_pool.stats()}")
+    print(f"🧮 Prompt tokens: {prompts.usage_stats()}")
+    if SPECULATE:
+        print(f"🔮 Speculation: {speculator.stats()}")
+    print(f"📻 Playback: {s.radio.stats}")
+    if LATENCY_TRACING:
+        print(f"⏱️ Latency by stage:\n{latency.TRACER.table()}")
+
+
+async def capture_voice(s):
+    """VAD hands us each phrase as soon as the driver stops talking."""
+    while s.vc.is_connected():
+        await s.on_air.wait()
+        if not s.vc.is_listening():
+            s.vc.listen(s.sink)
+        utterance = await s.sink.next_utterance(timeout=1)
+        if utterance is None:
+            continue
+        if s.utterances.full():
+            s.utterances.get_nowait()       # STT is behind: keep the newest phrase
+        s.utterances.put_nowait(utterance)
+
+
+async def transcribe_voice(s):
+    """Trigger spotting + STT; questions for the engineer go to the decision stage."""
+    while True:
+        utterance = await s.utterances.get()
+        if not s.live or not stt.loaded:
             continue
-        #user_text = transcribe_audio(idle_path)
-        user_text = await transcribe_audio(idle_path)
+        # the round trip starts when the driver stops talking
+        trace = latency.start("driver_query", origin=utterance.ended_at)
+        trace.mark("vad_cut", at=utterance.cut_at)
+        with latency.active(trace):
+            # only pay for a full beam-search decode if the head sounds like the trigger
+            with trace.span("trigger_match"):
+                likely = await trigger_spotter.likely(utterance.pcm)
+            if not likely:
+                continue
+            user_text = await transcribe_audio(utterance.pcm)
         print("🗣️ You said:", user_text)
-        
-        
-        # telemetry-based triggers
-        latest = telemetry.get_latest()        
-        
-        #if not starts_with_trigger(user_text):
-        #    continue
-        
-        if starts_with_trigger(user_text): 
-            vc.play(QuietFFmpegPCMAudio("Message_Received.wav", options="-filter:a volume=0.2"))
-            while vc.is_playing():
-                await asyncio.sleep(0.2)
-            print("You are here in the loop")
-            query = re.sub(r"^radio|^really|^video","", user_text.strip().lower()).strip()
-            user_text = ""
-            print("🎤 Engineer Triggered Phrase:", query)
-    
-            stats = latest_telemetry_data()
-            system_prompt = MAIN_PROMPT+(
-                f" The car stats now in the race are as follows: {stats} "
-                f"Answer the driver's question as if on the radio. Be as short and concise as possible! Time and speed matter. "
+        if not starts_with_trigger(user_text):
+            continue
+        if radio_assets.loaded and radio_assets.message_received:
+            enqueue(radio_assets.message_received, "message_received")
+        query = re.sub(r"^radio|^really|^video","", user_text.strip().lower()).strip()
+        print("🎤 Engineer Triggered Phrase:", query)
+        s.driver_queries.add(trace)
+        await s.decisions.put(("driver_query", answer_driver, (s, trace, query)))
+
+
+# ─── driver questions ─────────────────────────────────────
+async def answer_driver(s, trace, query):
+    try:
+        with trace.span("prompt_build"):
+            messages = callout_messages("driver_query", (
+                f"Answer the driver's question as if on the radio, as short as possible. "
                 f"Their question: {query}"
-            )
+            ))
+        with latency.active(trace):
             if not query:
-                reply = "Loud and clear. Standing by for your next instruction."
+                reply = CANNED_LINES["radio_check"]
+                await play_line(s.vc, reply, "engineer_response")
             else:
-                reply = client.chat.completions.create(
-                    model="gpt-4o-mini",
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": query}
-                    ]
-                ).choices[0].message.content
-    
-            print("🤖 Engineer:", reply)
-            
-            try:
-                tts_path = await synthesize_response(reply, "engineer_response")
-                vc.play(QuietFFmpegPCMAudio(tts_path))
-                while vc.is_playing():
-                    await asyncio.sleep(0.2)
-            except Exception as e:
-                print(f"❌ TTS failed — no audio response. Reason: {e}")
-            continue
-        await maybe_handle_overtake(vc, latest)
-        await maybe_handle_lap_update(vc, latest)
-        await maybe_announce_fuel(vc)
-
+                reply = await speak_llm(s.vc, messages, "engineer_response", kind="driver_query")
+                if not reply:
+                    reply = CANNED_LINES["say_again"]
+                    await play_line(s.vc, reply, "engineer_response")
+    finally:
+        s.driver_queries.discard(trace)
+    print("🤖 Engineer:", reply)
+
+
+# ─── overtakes ─────────────────────────────────────────────
+def detect_overtake(s, latest):
+    """(previous, current) position if an overtake is worth a call, else None."""
+    curr_pos = latest.race_start_pos
 
-async def maybe_announce_fuel(vc):
-    global announced_fuel_levels
-    t = telemetry.get_latest()
-    if not t:
+    # Don't check for overtakes until after lap 2 and position is initialized
+    if not s.has_initialized_position:
+        if latest.current_lap >= 2:
+            s.prev_position = curr_pos
+            s.has_initialized_position = True
+        return None
+    event = None
+    # only after lap 2, with a 45s cooldown
+    if latest.current_lap >= 2 and s.prev_position is not None and curr_pos != s.prev_position:
+        if time.time() - s.last_pos_call > 45:
+            event = s.prev_position, curr_pos
+            s.last_pos_call = time.time()
+    s.prev_position = curr_pos
+    return event
+
+
+async def announce_overtake(vc, trace, prev_pos, curr_pos):
+    if PHRASEBANK:
+        with latency.active(trace):
+            await play_phrase(vc, "position_gained" if curr_pos < prev_pos else "position_lost",
+                              "overtake", position=curr_pos)
         return
+    with trace.span("prompt_build"):
+        flavour = "gained a place" if curr_pos < prev_pos else "lost a place"
+        messages = callout_messages("overtake", (
+            f"The driver just {flavour} (from P{prev_pos} to P{curr_pos}). "
+            f"Quip about it and say what place they are now in, 10 words or fewer."
+        ))
+    with latency.active(trace):
+        await speak_llm(vc, messages, "overtake")
+
+
+# ─── lap updates ───────────────────────────────────────────
+def detect_lap_update(s, latest):
+    """(lap, total, new_best) when a new lap has started, else None."""
+    lap = latest.current_lap
+    total = latest.total_laps
+
+    # skip lap 1
+    if lap is None or lap == 1 or lap == s.prev_lap:
+        return None
+    s.prev_lap = lap
+    new_best = False
+    if latest.best_lap_time_ms != -1:
+        # best lap as the game had it while we were still on the previous lap
+        prev_best = telemetry.history.best_lap_before(lap - 1)
+        new_best = prev_best in (None, -1) or latest.best_lap_time_ms < prev_best
+    return lap, total, new_best
+
+
+async def announce_lap_update(vc, trace, latest, lap, total, new_best):
+    # with the phrasebank on, a new best lap is spliced onto the normal update
+    best_phrase = PHRASEBANK and new_best and not (lap > total and total != 0)
+    await lap_update_line(vc, trace, latest, lap, total, new_best and not best_phrase)
+    if best_phrase:
+        with latency.active(trace):
+            await play_phrase(vc, "best_lap", "lap_update", lap_time_ms=latest.best_lap_time_ms)
+
+
+async def lap_update_line(vc, trace, latest, lap, total, new_best):
+    """The regular lap update; `new_best` asks the LLM to mention the best lap itself."""
+    if SPECULATE:
+        if new_best:
+            speculator.discard("lap_update")    # written before anyone knew about the best lap
+        else:
+            reply = await claim("lap_update", lap, lap_signature(latest))
+            if reply:
+                with latency.active(trace):
+                    await play_line(vc, reply, "lap_update")
+                return
+    with trace.span("prompt_build"):
+        task = lap_update_task(lap, total)
+        if new_best:
+            task += f" Tell them they just set a new best lap of {lap_time(latest.best_lap_time_ms)}."
+        messages = callout_messages("lap_update", task)
+    with latency.active(trace):
+        await speak_llm(vc, messages, "lap_update")
+
+
+def lap_update_task(lap, total):
+    if ( lap > total) & (total!=0):
+        return ("The race just finished. Congratulate the driver and give a "
+                "one super-short sentence update on the race and the position they got.")
+    return f"We are on lap {lap} of {total}. Give the driver a one or two super-short sentence update."
+
 
-    fuel_pct = int((t.fuel_level / t.fuel_capacity) * 100)
+# ─── fuel ──────────────────────────────────────────────────
+def detect_fuel(s, t):
+    """The alert level fuel just dropped to, else None."""
+    fuel_pct = int(t.fuel_pct)
 
-    for thresh in list(announced_fuel_levels):
+    for thresh in list(s.announced_fuel_levels):
         if fuel_pct > thresh:
-            announced_fuel_levels.remove(thresh)
-    # Only react at exact thresholds (30, 20, 10) and not if already announced
-    critical_levels = [50, 20, 10]
-    for level in critical_levels:
-        if fuel_pct <= level and level not in announced_fuel_levels:
-            announced_fuel_levels.add(level)
-            
-            stats = latest_telemetry_data()
-            system_prompt = MAIN_PROMPT + (
-                f" The car's current data is: {stats}.  "
-                f"Fuel just dropped below {fuel_pct}%." 
-                f"Tell them their fuel level. Make a short quip, but actually give the driver the percentage of fuel they have left. Keep your response ultra short!"
-            )
+            s.announced_fuel_levels.remove(thresh)
+    # Only react at exact thresholds (50, 20, 10) and not if already announced
+    for level in FUEL_ALERT_LEVELS:
+        if fuel_pct <= level and level not in s.announced_fuel_levels:
+            s.announced_fuel_levels.add(level)
+            return level    # one alert per packet
+    return None
+
+
+def fuel_task(fuel_pct):
+    return f"Fuel just dropped below {fuel_pct}%. Tell the driver the percentage left with a short quip. Ultra short."
+
+
+async def announce_fuel(vc, trace, t, level):
+    if PHRASEBANK:
+        with latency.active(trace):
+            reply = await play_phrase(vc, "fuel", f"fuel_{level}", fuel=level)
+        print(f"⛽ Fuel Alert {level}%: {reply}")
+        return
+    reply = await claim("fuel", level, level) if SPECULATE else None
+    if reply:
+        with latency.active(trace):
+            await play_line(vc, reply, f"fuel_{level}")
+        print(f"⛽ Fuel Alert {level}%: {reply}")
+        return
+    with trace.span("prompt_build"):
+        messages = callout_messages("fuel", fuel_task(int(t.fuel_pct)))
+    with latency.active(trace):
+        reply = await speak_llm(vc, messages, f"fuel_{level}", kind="fuel")
+    print(f"⛽ Fuel Alert {level}%: {reply}")
+
+
+# ─── Core Voice Handling ───────────────────────────────
+async def handle_engineer_flow(vc):
+    """Run one engineer session on `vc` until it disconnects."""
+    global session
+    session = RaceSession(vc)
+    await session.run()
+
 
-            reply = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": system_prompt}
-                ]
-            ).choices[0].message.content
-            
-            print(f"⛽ Fuel Alert {level}%: {reply}")
-            try:
-                tts_path = await synthesize_response(reply, f"fuel_{level}")
-                vc.play(QuietFFmpegPCMAudio(tts_path))
-                while vc.is_playing():
-                    await asyncio.sleep(0.05)
-            except Exception as e:
-                print(f"❌ Fuel TTS failed: {e}")
-            break  # avoid multiple alerts in the same cycle
-                
-            
 # ─── Bot Commands ──────────────────────────────────────
 
 @bot.event
 async def on_ready():
     print(f"✅ Logged in as {bot.user}")
+    asyncio.create_task(prerender_all())
+
+
+async def prerender_all():
+    await prerender_lines(list(CANNED_LINES.values()))
+    if PHRASEBANK:
+        await prerender_phrasebank()    # after the canned lines: they are needed first
 
 
 @bot.command()
@@ -536,8 +915,26 @@ async def engineer(ctx):
     await handle_engineer_flow(vc)
     
     
+@bot.command(name="latency")
+async def latency_report(ctx):
+    """Dump the stage histograms to latency.json / latency.prom and post the p50/p95/p99 table."""
+    if not LATENCY_TRACING:
+        return await ctx.send("Latency tracing is off (LATENCY_TRACING).")
+    with open("latency.json", "w", encoding="utf-8") as f:
+        json.dump(latency.to_json(), f, indent=2)
+    with open("latency.prom", "w", encoding="utf-8") as f:
+        f.write(latency.to_prometheus())
+    table = latency.TRACER.table() or "no samples yet"
+    await ctx.send(f"```\n{table[:1900]}\n```")
+
+
 def run_with_telemetry(telemetry_server):
     global telemetry
     telemetry = telemetry_server
-        
-    bot.run(TOKEN)
+    start_background_loading()      # no-op if the launcher already did
+    recorder = SessionRecorder.new_session(SESSION_DIR, driver=driver_name).attach(telemetry) if SESSION_DIR else None
+    try:
+        bot.run(TOKEN)
+    finally:
+        if recorder:
+            recorder.close()
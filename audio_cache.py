@@ -0,0 +1,99 @@
+"""
+Content-addressed cache of finished radio audio.
+
+Entries are keyed on what actually determines the sound — normalized text,
+TTS speaker and radio-filter settings — and hold the final 48 kHz stereo PCM,
+ready to hand to PCMAudio. A byte-budgeted LRU lives in memory; an optional
+directory keeps rendered lines across restarts.
+"""
+import hashlib
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+
+
+def normalize_text(text):
+    text = unicodedata.normalize("NFKC", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def cache_key(text, speaker, filter_params):
+    """Stable hex digest for (normalized text, speaker, filter settings)."""
+    params = ";".join(f"{k}={filter_params[k]}" for k in sorted(filter_params))
+    raw = "\x1f".join((normalize_text(text), speaker, params))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class AudioCache:
+    def __init__(self, max_bytes=64 * 1024 * 1024, disk_dir=None):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.pcm")
+
+    def get(self, key):
+        with self._lock:
+            pcm = self._entries.get(key)
+            if pcm is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return pcm
+        if self.disk_dir and os.path.exists(self._path(key)):
+            with open(self._path(key), "rb") as f:
+                pcm = f.read()
+            self._remember(key, pcm)
+            with self._lock:
+                self.disk_hits += 1
+            return pcm
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, pcm, persist=True):
+        """Store `pcm`; with `persist` it also goes to the disk tier (if any)."""
+        self._remember(key, pcm)
+        if persist and self.disk_dir:
+            tmp = self._path(key) + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(pcm)
+            os.replace(tmp, self._path(key))
+
+    def _remember(self, key, pcm):
+        if len(pcm) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._entries[key] = pcm
+            self._bytes += len(pcm)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def __contains__(self, key):
+        with self._lock:
+            if key in self._entries:
+                return True
+        return bool(self.disk_dir) and os.path.exists(self._path(key))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
@@ -3,24 +3,361 @@
 GT7 Telemetry Bridge Script
 Connects to GT7 using gt_telem library and outputs JSON telemetry data
 that can be consumed by the Node.js backend.
+
+    python gt7_bridge.py                    # JSON lines at 20 Hz (default)
+    python gt7_bridge.py --format binary    # one binary frame per GT7 packet
+    python gt7_bridge.py --format binary --delta
+    python gt7_bridge.py --channels minimal      # or engineer (default) / full
+    python gt7_bridge.py --hub 127.0.0.1:33750   # read from the engineer's telemetry hub
+
+Binary frames are length-prefixed: a FRAME_HEADER (payload length, frame
+type) then the payload. The first frame is a JSON schema listing the fields
+and their struct codes; then every new packet is a FULL frame (packet id +
+all fields) or, with --delta, a DELTA frame (packet id + bitmask of changed
+fields + just those values), with a FULL keyframe every --keyframe-every
+packets. See read_frames() for a reference decoder.
+
+With --hub (or GT7_TELEMETRY_HUB) the bridge subscribes to a running
+telemetry_hub over its JSON-lines protocol instead of binding a second UDP
+receiver next to the engineer's. If the hub isn't there, or goes away, it
+falls back to its own TurismoClient.
 """
 
+import argparse
 import json
+import socket
+import struct
+import threading
 import time
 import sys
 import os
+from operator import attrgetter, itemgetter
+from types import SimpleNamespace
 from gt_telem import TurismoClient
 from gt_telem.errors.playstation_errors import PlayStationNotFoundError, PlayStatonOnStandbyError
 
-class GT7Bridge:
+FRAME_HEADER = struct.Struct("<IB")     # payload length, frame type
+FRAME_SCHEMA, FRAME_FULL, FRAME_DELTA = 0, 1, 2
+_DELTA_HEAD = struct.Struct("<iQ")      # packet id, changed-field bitmask
+
+# ─── channel table ────────────────────────────────────────
+# Output key -> (gt_telem attribute(s), conversion, struct code). The
+# conversion is None (as is), a number (scale factor) or a callable taking the
+# attribute values. FieldMap compiles a channel set once into a single
+# attrgetter plus one small extractor per channel, so a packet costs only
+# the channels that were selected.
+MPS_TO_KPH = 3.6
+PACKETS_PER_SECOND = 60
+
+
+def _fuel_percent(level, capacity):
+    return max(0, min(100, level / capacity * 100)) if capacity > 0 else 100
+
+
+def _lap_delta(last_ms, best_ms):
+    return last_ms - best_ms if best_ms > 0 and last_ms > 0 else 0
+
+
+class _LapDistance:
+    """Metres since the lap started, integrated from speed (GT7 sends no lap distance)."""
+
     def __init__(self):
+        self.lap = None
+        self.packet_id = None
+        self.metres = 0.0
+
+    def __call__(self, lap, speed_mps, packet_id):
+        if lap != self.lap:
+            self.lap, self.metres = lap, 0.0
+        elif self.packet_id is not None and packet_id > self.packet_id:
+            self.metres += speed_mps * (packet_id - self.packet_id) / PACKETS_PER_SECOND
+        self.packet_id = packet_id
+        return self.metres
+
+
+CHANNELS = {
+    # race
+    "position": ("race_start_pos", None, "h"),
+    "currentLap": ("current_lap", None, "h"),
+    "totalLaps": ("total_laps", None, "h"),
+    "totalCars": ("total_cars", None, "h"),
+    # speed and engine
+    "speedKph": ("speed_mps", MPS_TO_KPH, "f"),
+    "engineRpm": ("engine_rpm", None, "f"),
+    "throttle": ("throttle", 100 / 255, "f"),     # 0–255 -> %
+    "brake": ("brake", 100 / 255, "f"),
+    "gear": ("bits", lambda v: v & 0b1111, "B"),
+    # fuel
+    "fuelCapacity": ("fuel_capacity", None, "f"),
+    "fuelLevel": ("fuel_level", None, "f"),
+    "fuelPercent": (("fuel_level", "fuel_capacity"), _fuel_percent, "f"),
+    # timing
+    "lastLapTimeMs": ("last_lap_time_ms", None, "i"),
+    "bestLapTimeMs": ("best_lap_time_ms", None, "i"),
+    "deltaMs": (("last_lap_time_ms", "best_lap_time_ms"), _lap_delta, "i"),
+    "lapDistanceM": (("current_lap", "speed_mps", "packet_id"), _LapDistance, "f"),
+    # tyres and engine temperatures
+    "tireTempFL": ("tire_fl_temp", None, "f"),
+    "tireTempFR": ("tire_fr_temp", None, "f"),
+    "tireTempRL": ("tire_rl_temp", None, "f"),
+    "tireTempRR": ("tire_rr_temp", None, "f"),
+    "oilPressure": ("oil_pressure", None, "f"),
+    "waterTemp": ("water_temp", None, "f"),
+    "oilTemp": ("oil_temp", None, "f"),
+    # where on track
+    "positionX": ("position_x", None, "f"),
+    "positionY": ("position_y", None, "f"),
+    "positionZ": ("position_z", None, "f"),
+    # raw
+    # gt_telem reads both as signed; bit 15 of flags makes it negative
+    "packetId": ("packet_id", None, "i"),
+    "flags": ("flags", None, "h"),
+    "suggestedGear": ("bits", lambda v: v >> 4 & 0b1111, "B"),
+    # metadata
+    "timestamp": ((), time.time, "d"),
+    "is_valid": ((), lambda: True, "?"),
+}
+
+_MINIMAL = ["position", "currentLap", "totalLaps", "speedKph", "fuelPercent", "timestamp", "is_valid"]
+_ENGINEER = _MINIMAL + [
+    "totalCars", "engineRpm", "throttle", "brake", "gear",
+    "fuelCapacity", "fuelLevel", "lastLapTimeMs", "bestLapTimeMs", "deltaMs", "lapDistanceM",
+    "tireTempFL", "tireTempFR", "tireTempRL", "tireTempRR", "oilPressure", "waterTemp", "oilTemp",
+    "positionX", "positionY", "positionZ",
+]
+CHANNEL_SETS = {
+    "minimal": _MINIMAL,
+    "engineer": _ENGINEER,      # everything the Node backend and the radio engineer read
+    "full": list(CHANNELS),
+}
+
+
+class FieldMap:
+    """A channel set compiled into one attrgetter call and one extractor per channel."""
+
+    def __init__(self, channel_set="engineer"):
+        self.keys = list(CHANNEL_SETS[channel_set])
+        self.codes = [CHANNELS[k][2] for k in self.keys]
+        attrs = []
+        for key in self.keys:
+            for attr in _sources(key):
+                if attr not in attrs:
+                    attrs.append(attr)
+        get = attrgetter(*attrs)
+        # attrgetter of one name returns the bare value, not a 1-tuple
+        self._fetch = get if len(attrs) > 1 else lambda t: (get(t),)
+        self._extract = [self._extractor(key, attrs) for key in self.keys]
+
+    def values(self, t):
+        """telemetry -> list in `keys` order"""
+        r = self._fetch(t)
+        return [extract(r) for extract in self._extract]
+
+    def as_dict(self, t):
+        """telemetry -> {key: value}"""
+        r = self._fetch(t)
+        return {key: extract(r) for key, extract in zip(self.keys, self._extract)}
+
+    @staticmethod
+    def _extractor(key, attrs):
+        """fetched attribute tuple -> this channel's value"""
+        _, convert, _ = CHANNELS[key]
+        indices = [attrs.index(a) for a in _sources(key)]
+        if convert is _LapDistance:
+            convert = _LapDistance()        # stateful: one per map
+        if not indices:
+            return lambda r: convert()
+        pick = itemgetter(*indices)
+        if convert is None:
+            return pick
+        if isinstance(convert, (int, float)):
+            scale = convert
+            return lambda r: pick(r) * scale
+        if len(indices) == 1:
+            return lambda r: convert(pick(r))
+        return lambda r: convert(*pick(r))
+
+
+def _sources(key):
+    source = CHANNELS[key][0]
+    return (source,) if isinstance(source, str) else source
+
+
+# gt_telem fires callbacks from a thread pool; anything this far behind the newest id is a straggler
+REORDER_WINDOW = 60
+
+
+class BinaryEncoder:
+    """Turns FieldMap values into FULL / DELTA frames. Not thread-safe."""
+
+    def __init__(self, fields, delta=False, keyframe_every=60):
+        self.names = fields.keys
+        self.codes = fields.codes
+        self._full = struct.Struct("<i" + "".join(self.codes))
+        self.delta = delta
+        self.keyframe_every = keyframe_every
+        self._prev = None
+        self._since_keyframe = 0
+        self._delta_structs = {}    # changed-field mask -> Struct
+
+    def schema_frame(self):
+        body = json.dumps({"fields": [[n, c] for n, c in zip(self.names, self.codes)],
+                           "delta": self.delta}).encode("utf-8")
+        return FRAME_HEADER.pack(len(body), FRAME_SCHEMA) + body
+
+    def _delta_struct(self, mask):
+        st = self._delta_structs.get(mask)
+        if st is None:
+            st = struct.Struct("<iQ" + "".join(c for i, c in enumerate(self.codes) if mask >> i & 1))
+            self._delta_structs[mask] = st
+        return st
+
+    def encode(self, packet_id, values):
+        prev, self._prev = self._prev, values
+        if not self.delta or prev is None or self._since_keyframe >= self.keyframe_every:
+            self._since_keyframe = 0
+            body = self._full.pack(packet_id, *values)
+            return FRAME_HEADER.pack(len(body), FRAME_FULL) + body
+        self._since_keyframe += 1
+        mask = 0
+        changed = []
+        for i, (new, old) in enumerate(zip(values, prev)):
+            if new != old:
+                mask |= 1 << i
+                changed.append(new)
+        body = self._delta_struct(mask).pack(packet_id, mask, *changed)
+        return FRAME_HEADER.pack(len(body), FRAME_DELTA) + body
+
+
+def read_frames(stream):
+    """Decode a binary bridge stream into (packet_id, full telemetry dict) pairs."""
+    names, codes, full, state = None, None, None, {}
+    while True:
+        head = stream.read(FRAME_HEADER.size)
+        if len(head) < FRAME_HEADER.size:
+            return
+        length, kind = FRAME_HEADER.unpack(head)
+        body = stream.read(length)
+        if kind == FRAME_SCHEMA:
+            schema = json.loads(body)
+            names = [n for n, _ in schema["fields"]]
+            codes = [c for _, c in schema["fields"]]
+            full = struct.Struct("<i" + "".join(codes))
+        elif kind == FRAME_FULL:
+            packet_id, *values = full.unpack(body)
+            state = dict(zip(names, values))
+            yield packet_id, dict(state)
+        elif kind == FRAME_DELTA:
+            packet_id, mask = _DELTA_HEAD.unpack_from(body)
+            picked = [i for i in range(len(names)) if mask >> i & 1]
+            values = struct.unpack_from("<" + "".join(codes[i] for i in picked), body, _DELTA_HEAD.size)
+            for i, value in zip(picked, values):
+                state[names[i]] = value
+            yield packet_id, dict(state)
+
+
+class BatchedWriter:
+    """Collects frames from the packet thread; a writer thread flushes them every `flush_ms`."""
+
+    def __init__(self, stream, flush_ms=20, max_buffer=64 * 1024):
+        self.stream = stream
+        self.flush_s = flush_ms / 1000
+        self.max_buffer = max_buffer
+        self.bytes_written = 0
+        self._buf = bytearray()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="bridge-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, frame):
+        with self._cond:
+            self._buf += frame
+            if len(self._buf) >= self.max_buffer:
+                self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._closed:
+                    self._cond.wait(self.flush_s)
+                chunk, self._buf = self._buf, bytearray()
+                closed = self._closed
+            if chunk:
+                try:
+                    self.stream.write(chunk)
+                    self.stream.flush()
+                    self.bytes_written += len(chunk)
+                except (BrokenPipeError, ValueError):
+                    return      # consumer went away
+            if closed:
+                return
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+
+class GT7Bridge:
+    def __init__(self, channels="engineer", hub=None):
         self.tc = None
         self.running = False
+        self.fields = FieldMap(channels)
+        self.hub = hub              # "host:port" of a telemetry_hub, or None for our own receiver
+        self.latest = None          # newest hub packet
+        self._hub_sock = None
+
+    def start(self, on_packet=None):
+        """Initialize GT7 telemetry connection; `on_packet(telemetry)` is called for every packet"""
+        if self.hub and self._start_hub(on_packet):
+            return True
+        return self._start_direct(on_packet)
 
-    def start(self):
-        """Initialize GT7 telemetry connection"""
+    def _start_hub(self, on_packet):
+        host, _, port = self.hub.rpartition(":")
+        try:
+            sock = socket.create_connection((host or "127.0.0.1", int(port)), timeout=2)
+        except (OSError, ValueError) as e:
+            print(f"❗ GT7 Bridge: telemetry hub {self.hub} not reachable ({e}) – using our own receiver",
+                  file=sys.stderr)
+            return False
+        sock.settimeout(None)
+        # every packet when each one is encoded, else about what the JSON loop polls at
+        rate = 0 if on_packet else 20
+        sock.sendall(json.dumps({"rate": rate, "channels": "full"}).encode() + b"\n")
+        self._hub_sock = sock
+        self.running = True
+        threading.Thread(target=self._read_hub, args=(sock, on_packet), name="bridge-hub", daemon=True).start()
+        print(f"✅ GT7 Bridge: Telemetry from hub {self.hub}", file=sys.stderr)
+        return True
+
+    def _read_hub(self, sock, on_packet):
+        problem = "connection closed"
+        try:
+            for line in sock.makefile("rb"):
+                frame = json.loads(line)
+                if not isinstance(frame, dict) or "error" in frame:
+                    problem = frame["error"] if isinstance(frame, dict) else f"unexpected frame {line[:80]!r}"
+                    break
+                packet = SimpleNamespace(**frame)
+                self.latest = packet
+                if on_packet:
+                    on_packet(packet)
+        except (OSError, ValueError) as e:
+            problem = str(e)
+        sock.close()
+        if self.running and self._hub_sock is sock:
+            self._hub_sock = None
+            self.latest = None
+            print(f"❗ GT7 Bridge: telemetry hub lost ({problem}) – using our own receiver", file=sys.stderr)
+            self.running = self._start_direct(on_packet)
+
+    def _start_direct(self, on_packet):
         try:
             self.tc = TurismoClient()
+            if on_packet:
+                self.tc.register_callback(GT7Bridge._dispatch, [on_packet])
             self.tc.start()
             print("✅ GT7 Bridge: Telemetry connection established", file=sys.stderr)
             self.running = True
@@ -35,63 +372,21 @@ class GT7Bridge:
             print(f"❌ GT7 Bridge: Failed to connect - {e}", file=sys.stderr)
             return False
 
-    def get_telemetry_json(self):
-        """Get current telemetry data as JSON"""
-        if not self.tc or not self.tc.telemetry:
-            return None
-            
-        telemetry = self.tc.telemetry
-        
-        # Convert GT7 telemetry to our expected format
-        data = {
-            # Position and race info
-            "position": getattr(telemetry, 'position', 1),
-            "currentLap": getattr(telemetry, 'lap_count', 0),
-            "totalLaps": getattr(telemetry, 'laps_in_race', 0),
-            
-            # Speed and engine data
-            "speedKph": getattr(telemetry, 'car_speed', 0) * 3.6,  # Convert m/s to km/h
-            "engineRpm": getattr(telemetry, 'engine_rpm', 0),
-            
-            # Fuel data
-            "fuelCapacity": getattr(telemetry, 'fuel_capacity', 100),
-            "fuelLevel": getattr(telemetry, 'fuel_level', 100),
-            
-            # Timing data
-            "lastLapTimeMs": int(getattr(telemetry, 'last_lap_time', 0) * 1000),
-            "bestLapTimeMs": int(getattr(telemetry, 'best_lap_time', 0) * 1000),
-            
-            # Tire temperatures
-            "tireTempFL": getattr(telemetry, 'tire_temp_fl', 80),
-            "tireTempFR": getattr(telemetry, 'tire_temp_fr', 80),
-            "tireTempRL": getattr(telemetry, 'tire_temp_rl', 80),
-            "tireTempRR": getattr(telemetry, 'tire_temp_rr', 80),
-            
-            # Engine data
-            "oilPressure": getattr(telemetry, 'oil_pressure', 4.5),
-            "waterTemp": getattr(telemetry, 'water_temperature', 90),
-            "oilTemp": getattr(telemetry, 'oil_temperature', 100),
-            
-            # Race info
-            "totalCars": getattr(telemetry, 'cars_in_race', 20),
-            
-            # Metadata
-            "timestamp": time.time(),
-            "is_valid": True
-        }
-        
-        # Calculate derived values
-        if data["fuelCapacity"] > 0:
-            data["fuelPercent"] = max(0, min(100, (data["fuelLevel"] / data["fuelCapacity"]) * 100))
-        else:
-            data["fuelPercent"] = 100
-            
-        if data["bestLapTimeMs"] > 0 and data["lastLapTimeMs"] > 0:
-            data["deltaMs"] = data["lastLapTimeMs"] - data["bestLapTimeMs"]
-        else:
-            data["deltaMs"] = 0
-        
-        return data
+    @staticmethod
+    def _dispatch(telemetry, on_packet):
+        # gt_telem calls back with (telemetry, *args) from its thread pool
+        on_packet(telemetry)
+
+    def get_telemetry_json(self, telemetry=None):
+        """Get current (or the given packet's) telemetry data as JSON"""
+        if telemetry is None:
+            if self._hub_sock is not None:
+                telemetry = self.latest
+            elif self.tc:
+                telemetry = self.tc.telemetry
+            if not telemetry:
+                return None
+        return self.fields.as_dict(telemetry)
 
     def run_continuous(self):
         """Run continuous telemetry output"""
@@ -117,13 +412,65 @@ class GT7Bridge:
         finally:
             self.stop()
 
+    def run_binary(self, delta=False, keyframe_every=60, flush_ms=20):
+        """Write one binary frame per new GT7 packet to stdout (see module docstring)"""
+        encoder = BinaryEncoder(self.fields, delta=delta, keyframe_every=keyframe_every)
+        out = BatchedWriter(sys.stdout.buffer, flush_ms=flush_ms)
+        out.write(encoder.schema_frame())
+        lock = threading.Lock()
+        last_id = None
+        packets = 0
+
+        def on_packet(telemetry):
+            nonlocal last_id, packets
+            packet_id = telemetry.packet_id
+            with lock:
+                if last_id is not None and 0 <= last_id - packet_id < REORDER_WINDOW:
+                    return      # same packet again, or a late straggler
+                last_id = packet_id
+                out.write(encoder.encode(packet_id, self.fields.values(telemetry)))
+                packets += 1
+
+        if not self.start(on_packet):
+            out.close()
+            return False
+        try:
+            while self.running:
+                time.sleep(0.5)
+        except KeyboardInterrupt:
+            print("🛑 GT7 Bridge: Shutting down", file=sys.stderr)
+        finally:
+            self.stop()
+            out.close()
+            if packets:
+                print(f"📦 GT7 Bridge: {packets} packets, {out.bytes_written / packets:.1f} bytes/packet",
+                      file=sys.stderr)
+
     def stop(self):
         """Stop the telemetry connection"""
         self.running = False
+        if self._hub_sock:
+            self._hub_sock.close()
+            self._hub_sock = None
         if self.tc:
             self.tc.stop()
             print("🛑 GT7 Bridge: Telemetry stopped", file=sys.stderr)
 
 if __name__ == "__main__":
-    bridge = GT7Bridge()
-    bridge.run_continuous()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="GT7 telemetry bridge")
+    parser.add_argument("--format", choices=("json", "binary"), default="json",
+                        help="json: a JSON line every 50 ms; binary: a frame per GT7 packet")
+    parser.add_argument("--channels", choices=sorted(CHANNEL_SETS), default="engineer",
+                        help="which telemetry channels to send")
+    parser.add_argument("--delta", action="store_true", help="binary: send only changed fields")
+    parser.add_argument("--keyframe-every", type=int, default=60, help="binary --delta: full frame interval (packets)")
+    parser.add_argument("--flush-ms", type=int, default=20, help="binary: how often batched frames are written")
+    parser.add_argument("--hub", default=os.getenv("GT7_TELEMETRY_HUB"),
+                        help="host:port of a running telemetry_hub to read from instead of our own UDP receiver")
+    args = parser.parse_args()
+
+    bridge = GT7Bridge(channels=args.channels, hub=args.hub)
+    if args.format == "binary":
+        bridge.run_binary(delta=args.delta, keyframe_every=args.keyframe_every, flush_ms=args.flush_ms)
+    else:
+        bridge.run_continuous()
\ No newline at end of file
@@ -46,7 +46,9 @@ export class TelemetryServer extends EventEmitter {
     
     try {
       console.log('🐍 Starting Python GT7 bridge...');
-      this.pythonProcess = spawn('python3', [pythonScript], {
+      // read from the engineer's telemetry hub when it runs (the bridge falls back to its own receiver)
+      const hub = process.env.GT7_TELEMETRY_HUB || '127.0.0.1:33750';
+      this.pythonProcess = spawn('python3', [pythonScript, '--hub', hub], {
         stdio: ['ignore', 'pipe', 'pipe']
       });
 
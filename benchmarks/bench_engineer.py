@@ -0,0 +1,327 @@
+"""
+Offline micro-benchmarks for the engineer's hot paths.
+
+Runs without a PS5, Discord or network: TTS is stubbed, telemetry is
+synthetic, and STT uses the local `tiny` int8 model (skipped if it isn't
+available). Results are JSON, keyed by benchmark name, so two runs can be
+compared and regressions flagged.
+
+    python benchmarks/bench_engineer.py --out bench.json
+    python benchmarks/bench_engineer.py --compare bench.json [--threshold 1.25]
+    python benchmarks/bench_engineer.py --only radio_filter
+"""
+import argparse
+import asyncio
+import glob
+import importlib.util
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+import wave
+from types import SimpleNamespace
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "backend"))
+os.chdir(ROOT)      # the engine resolves assets and cache dirs relative to here
+
+import GT7_Radio_GenAI as engine  # noqa: E402
+from bench_radio_filter import check_loudness, voice_like_clip  # noqa: E402
+from radio_filter import apply_radio_filter, apply_radio_filter_fast  # noqa: E402
+from replay import synthetic_race  # noqa: E402
+from startup import LazyHandle  # noqa: E402
+from telemetry_history import TelemetryHistory  # noqa: E402
+from telemetry_snapshot import FIELDS, TelemetrySnapshot  # noqa: E402
+
+CLIP_SECONDS = (1, 3, 10)
+FIXTURES = ("benchmarks/fixtures/*.wav", "recordings/*.wav")
+
+
+# ─── harness ───────────────────────────────────────────────
+def measure(fn, repeat):
+    """Per-call seconds for `repeat` rounds of enough calls to fill ~0.2 s."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return [t / number for t in timer.repeat(repeat, number)], number
+
+
+def result(name, fn, repeat, **params):
+    per_call, number = measure(fn, repeat)
+    return {
+        "name": name,
+        "params": params,
+        "calls_per_round": number,
+        "min_us": round(min(per_call) * 1e6, 2),
+        "median_us": round(statistics.median(per_call) * 1e6, 2),
+        "max_us": round(max(per_call) * 1e6, 2),
+    }
+
+
+def skipped(name, reason):
+    return {"name": name, "skipped": reason}
+
+
+def run_async(loop, coro_fn):
+    return lambda: loop.run_until_complete(coro_fn())
+
+
+def ready(name, value):
+    handle = LazyHandle(name, lambda: value)
+    handle.load()
+    return handle
+
+
+# ─── benchmarks ────────────────────────────────────────────
+def bench_radio_filter(repeat):
+    out = []
+    for seconds in CLIP_SECONDS:
+        clip = voice_like_clip(seconds)
+        check_loudness(clip)
+        out.append(result(f"radio_filter/pydub/{seconds}s", lambda: apply_radio_filter(clip), repeat))
+        out.append(result(f"radio_filter/numpy/{seconds}s", lambda: apply_radio_filter_fast(clip), repeat))
+    return out
+
+
+def bench_synthesize_response(repeat):
+    """Everything after TTS: radio filter, Discord PCM, clicks – cache bypassed."""
+    loop = asyncio.new_event_loop()
+    assets = SimpleNamespace(click_in=bytes(3840 * 10), click_out=bytes(3840 * 25), message_received=None)
+    saved = {name: getattr(engine, name) for name in ("tts_segment", "radio_assets", "audio_cache")}
+    out = []
+    try:
+        engine.radio_assets = ready("radio_assets", assets)
+        engine.audio_cache = engine.AudioCache(max_bytes=0)     # nothing fits: every call renders
+        with open(os.devnull, "w") as quiet:
+            stdout, sys.stdout = sys.stdout, quiet                # synthesize_response prints per attempt
+            try:
+                for seconds in CLIP_SECONDS:
+                    clip = voice_like_clip(seconds)
+
+                    async def stub_tts(text, timeout_sec=10, clip=clip):
+                        return clip
+
+                    engine.tts_segment = stub_tts
+                    out.append(result(f"synthesize_response/{seconds}s",
+                                      run_async(loop, lambda: engine.synthesize_response("Box this lap.")),
+                                      repeat))
+            finally:
+                sys.stdout = stdout
+    finally:
+        for name, value in saved.items():
+            setattr(engine, name, value)
+        loop.close()
+    return out
+
+
+def load_fixture(path):
+    """WAV -> 16 kHz mono float32, as the VAD sink hands it to STT."""
+    with wave.open(path) as w:
+        rate, channels, width = w.getframerate(), w.getnchannels(), w.getsampwidth()
+        raw = w.readframes(w.getnframes())
+    x = np.frombuffer(raw, dtype={1: np.uint8, 2: np.int16, 4: np.int32}[width]).astype(np.float32)
+    if width == 1:
+        x -= 128
+    x = x.reshape(-1, channels).mean(axis=1) / float(1 << (8 * width - 1))
+    n = int(len(x) * 16000 / rate)
+    return np.interp(np.linspace(0, len(x) - 1, n), np.arange(len(x)), x).astype(np.float32)
+
+
+def bench_transcribe(repeat):
+    fixtures = sorted(p for pattern in FIXTURES for p in glob.glob(pattern))
+    if not fixtures:
+        return [skipped("transcribe_audio", "no speech fixtures")]
+    if importlib.util.find_spec("faster_whisper") is None:
+        return [skipped("transcribe_audio", "faster-whisper not installed")]
+    from stt_service import SttService
+    service = SttService(compute_type="int8", preload=("tiny",)).start()
+    if not service.ready.wait(300) or service.error is not None:
+        service.stop()
+        return [skipped("transcribe_audio", "tiny model did not load (offline and not cached?)")]
+
+    loop = asyncio.new_event_loop()
+    saved = engine.stt
+    out = []
+    try:
+        engine.stt = ready("stt", service)
+        for path in fixtures:
+            audio = load_fixture(path)
+            name = os.path.splitext(os.path.basename(path))[0]
+            for kind in ("trigger", "query"):
+                out.append(result(f"transcribe_audio/{kind}/{name}",
+                                  run_async(loop, lambda: engine.transcribe_audio(audio, kind=kind)),
+                                  repeat, audio_s=round(len(audio) / 16000, 2)))
+    finally:
+        engine.stt = saved
+        service.stop()
+        loop.close()
+    return out
+
+
+class _FakeTelemetry:
+    """Just what callout_messages reads: a fresh packet and a lap history."""
+
+    def __init__(self, rows):
+        self.history = TelemetryHistory()
+        for i, row in enumerate(rows):
+            self.history.append(_snapshot(i, row, float(row["t"])), float(row["t"]))
+        # received "in the future" so it never goes stale however long the run takes
+        self.latest = _snapshot(len(rows), rows[-1], time.monotonic() + 3600)
+
+    def get_latest(self):
+        return self.latest
+
+
+def _snapshot(seq, row, received_at):
+    return TelemetrySnapshot(seq, received_at, **{name: row[name].item() for name in FIELDS
+                                                  if name in row.dtype.names})
+
+
+def bench_prompts(repeat):
+    rows = synthetic_race(laps=3)
+    lap3 = np.flatnonzero(rows["current_lap"] == 3)
+    saved = getattr(engine, "telemetry", None)
+    out = []
+    try:
+        # halfway round lap 3, with two laps of fuel history behind it
+        engine.telemetry = _FakeTelemetry(rows[:lap3[len(lap3) // 2]])
+        for kind in ("overtake", "lap_update", "fuel", "driver_query"):
+            chars = sum(len(m["content"]) for m in engine.callout_messages(kind, "Task."))
+            out.append(result(f"callout_messages/{kind}", lambda: engine.callout_messages(kind, "Task."),
+                              repeat, prompt_chars=chars))
+        return out
+    finally:
+        engine.telemetry = saved
+
+
+def bench_formatting(repeat):
+    """Text helpers every callout runs through before TTS or the cache lookup."""
+    match = engine.re.search(r"P(\d+)", "You're up to P3, keep pushing")
+    line = "Box this lap, P3 is yours if you keep it clean."
+    return [
+        result("replace_p_with_words", lambda: engine.replace_p_with_words(match), repeat),
+        result("lap_time", lambda: engine.lap_time(83456), repeat),
+        result("line_key", lambda: engine.line_key(line), repeat),
+    ]
+
+
+def bench_bridge(repeat):
+    if importlib.util.find_spec("gt_telem") is None:
+        return [skipped("gt7_bridge.get_telemetry_json", "gt_telem not installed")]
+    from gt7_bridge import BinaryEncoder, GT7Bridge
+    rows = synthetic_race(laps=2)
+    row = rows[len(rows) // 2]
+    packet = SimpleNamespace(**{name: row[name].item() for name in FIELDS if name in row.dtype.names})
+    packet.bits = 3
+    packet.flags = -32767       # bit 15 set: gt_telem hands flags over as a signed int16
+    bridge = GT7Bridge()
+    bridge.tc = SimpleNamespace(telemetry=packet)
+    out = [
+        result("gt7_bridge.get_telemetry_json", bridge.get_telemetry_json, repeat),
+        result("gt7_bridge.get_telemetry_json+dumps", lambda: json.dumps(bridge.get_telemetry_json()), repeat),
+    ]
+    full = GT7Bridge(channels="full")
+    check_binary_roundtrip(full.fields, packet)
+    for delta in (False, True):
+        encoder = BinaryEncoder(full.fields, delta=delta)
+        out.append(result(f"gt7_bridge.encode/{'delta' if delta else 'full'}",
+                          lambda: encoder.encode(packet.packet_id, full.fields.values(packet)), repeat))
+    return out
+
+
+def check_binary_roundtrip(fields, packet):
+    """Encode a packet as FULL and DELTA frames and decode them again – every channel must survive."""
+    from gt7_bridge import BinaryEncoder, read_frames
+    encoder = BinaryEncoder(fields, delta=True)
+    values = fields.values(packet)
+    stream = io.BytesIO(encoder.schema_frame() + encoder.encode(packet.packet_id, values)
+                        + encoder.encode(packet.packet_id + 1, values))
+    frames = list(read_frames(stream))
+    assert [packet_id for packet_id, _ in frames] == [packet.packet_id, packet.packet_id + 1], frames
+    for _, decoded in frames:
+        for key, code, value in zip(fields.keys, fields.codes, values):
+            if code in "hiIBH?":
+                assert decoded[key] == value, (key, decoded[key], value)
+
+
+BENCHES = {
+    "radio_filter": bench_radio_filter,
+    "synthesize_response": bench_synthesize_response,
+    "transcribe_audio": bench_transcribe,
+    "prompts": bench_prompts,
+    "formatting": bench_formatting,
+    "gt7_bridge": bench_bridge,
+}
+
+
+# ─── reporting ─────────────────────────────────────────────
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, cwd=ROOT).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "commit": commit,
+        "when": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def compare(results, baseline, threshold):
+    """Print old vs new medians; return the names that got slower than `threshold`x."""
+    old = {r["name"]: r for r in baseline["results"] if "median_us" in r}
+    slower = []
+    print(f"{'benchmark':<44} {'before':>12} {'after':>12} {'ratio':>7}")
+    for r in results:
+        if "median_us" not in r or r["name"] not in old:
+            continue
+        ratio = r["median_us"] / old[r["name"]]["median_us"]
+        flag = "  <-- slower" if ratio > threshold else ""
+        print(f"{r['name']:<44} {old[r['name']]['median_us']:>10.1f}us {r['median_us']:>10.1f}us {ratio:>6.2f}x{flag}")
+        if ratio > threshold:
+            slower.append(r["name"])
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="timing rounds per benchmark")
+    parser.add_argument("--only", action="append", choices=sorted(BENCHES), help="run just these groups")
+    parser.add_argument("--out", help="write results JSON here")
+    parser.add_argument("--compare", help="baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio that counts as a regression")
+    args = parser.parse_args()
+
+    results = []
+    for group in args.only or BENCHES:
+        print(f"… {group}", file=sys.stderr)
+        results.extend(BENCHES[group](args.repeat))
+    report = {"environment": environment(), "results": results}
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            slower = compare(results, json.load(f), args.threshold)
+        if slower:
+            print(f"{len(slower)} regression(s): {', '.join(slower)}")
+            sys.exit(1)
+    elif not args.out:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
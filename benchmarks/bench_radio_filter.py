@@ -0,0 +1,85 @@
+"""
+pydub vs NumPy radio filter on synthetic 2–10 s voice-like clips.
+
+    python benchmarks/bench_radio_filter.py [--repeat 3] [--json]
+
+Also checks that both produce the same loudness (output RMS within
+LOUDNESS_TOLERANCE_DB).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from radio_filter import (  # noqa: E402
+    apply_radio_filter, apply_radio_filter_fast, float_to_segment, segment_to_float,
+)
+
+TTS_RATE = 22050        # Coqui VITS output rate
+LOUDNESS_TOLERANCE_DB = 1.0
+
+
+def voice_like_clip(seconds, rate=TTS_RATE, seed=0):
+    """Harmonic buzz with a syllable-rate envelope plus a little breath noise."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * rate)) / rate
+    f0 = 120 + 20 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / rate
+    voice = sum(np.sin(k * phase) / k for k in range(1, 12))
+    envelope = np.clip(np.sin(2 * np.pi * 4 * t), 0, None) ** 0.5
+    x = voice * envelope + 0.02 * rng.standard_normal(len(t))
+    return float_to_segment(0.5 * x / np.max(np.abs(x)), rate)
+
+
+def rms_db(audio):
+    x = segment_to_float(audio)
+    return 20 * np.log10(np.sqrt(np.mean(x * x)) + 1e-12)
+
+
+def check_loudness(clip):
+    """Both filters normalize to the same peak – their output RMS must agree too."""
+    delta = rms_db(apply_radio_filter_fast(clip)) - rms_db(apply_radio_filter(clip))
+    assert abs(delta) <= LOUDNESS_TOLERANCE_DB, f"numpy filter is {delta:+.2f} dB off pydub"
+    return delta
+
+
+def best_of(fn, arg, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(arg)
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    results = []
+    for seconds in (2, 5, 10):
+        clip = voice_like_clip(seconds)
+        slow = best_of(apply_radio_filter, clip, args.repeat)
+        fast = best_of(apply_radio_filter_fast, clip, args.repeat)
+        results.append({"clip_s": seconds, "pydub_ms": round(slow * 1000, 1),
+                        "numpy_ms": round(fast * 1000, 1), "speedup": round(slow / fast, 1),
+                        "rms_delta_db": round(check_loudness(clip), 2)})
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'clip':>6} {'pydub':>10} {'numpy':>10} {'speedup':>8} {'rms':>8}")
+    for r in results:
+        print(f"{r['clip_s']:>5}s {r['pydub_ms']:>8.1f}ms {r['numpy_ms']:>8.1f}ms {r['speedup']:>7.1f}x"
+              f" {r['rms_delta_db']:>+6.2f}dB")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,8 @@ import subprocess
 import re
 import platform
 
+from telemetry_hub import HUB_PORT
+
 SCRIPT_TO_RUN = "launcher.py"  # Your full launcher logic
 
 env = os.environ.copy()
@@ -103,5 +105,8 @@ def main():
     root.mainloop()
 
 if __name__ == "__main__":
-    kill_port_users("33742")  # Or whatever port GT7 uses
+    # a hub we were pointed at owns the UDP receiver – leave it alone
+    if not os.getenv("GT7_TELEMETRY_HUB"):
+        kill_port_users("33742")  # Or whatever port GT7 uses
+        kill_port_users(str(HUB_PORT))  # a leftover engine's telemetry hub
     main()
\ No newline at end of file
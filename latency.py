@@ -0,0 +1,240 @@
+"""
+Per-stage latency tracing for the radio round trip.
+
+A Trace follows one callout (a driver query, a lap update, an overtake or a
+fuel call) from its origin — for a driver query, the moment they stopped
+talking — through STT, the LLM, TTS, the radio filter and playback. Stages
+are recorded either as spans (how long the stage took) or as marks (how long
+after the origin it happened), into log-bucketed histograms keyed by
+(flow, stage).
+
+The active trace travels in a ContextVar, so code deep in the pipeline can
+call `latency.span("tts")` without the trace being passed down. With tracing
+disabled every call returns a shared no-op object.
+
+Dump with `to_json()` or `to_prometheus()` (p50/p95/p99 per stage).
+"""
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+SUB_BUCKET_BITS = 7         # 128 sub-buckets per power of two: < 1% error
+
+
+class LatencyHistogram:
+    """HDR-style histogram of microsecond values: exact counts, ~1% buckets."""
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    @staticmethod
+    def _index(v):
+        if v < (1 << SUB_BUCKET_BITS):
+            return v
+        shift = v.bit_length() - SUB_BUCKET_BITS
+        return (shift << (SUB_BUCKET_BITS - 1)) + (v >> shift)
+
+    @staticmethod
+    def _value(i):
+        """Midpoint of bucket `i`."""
+        half = 1 << (SUB_BUCKET_BITS - 1)
+        if i < (1 << SUB_BUCKET_BITS):
+            return i
+        shift = i // half - 1
+        return ((i - shift * half) << shift) + (1 << shift) // 2
+
+    def record(self, micros):
+        v = max(0, int(micros))
+        i = self._index(v)
+        self.counts[i] = self.counts.get(i, 0) + 1
+        self.count += 1
+        self.total += v
+        self.max = max(self.max, v)
+        self.min = v if self.min is None else min(self.min, v)
+
+    def percentile(self, q):
+        if not self.count:
+            return 0
+        rank = max(1, round(q / 100 * self.count))
+        seen = 0
+        for i in sorted(self.counts):
+            seen += self.counts[i]
+            if seen >= rank:
+                return min(self._value(i), self.max)
+        return self.max
+
+    def summary(self):
+        """Milliseconds."""
+        return {
+            "count": self.count,
+            "p50": self.percentile(50) / 1000,
+            "p95": self.percentile(95) / 1000,
+            "p99": self.percentile(99) / 1000,
+            "max": self.max / 1000,
+            "mean": round(self.total / self.count / 1000, 3) if self.count else 0,
+        }
+
+
+class Tracer:
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.histograms = {}    # (flow, stage) -> LatencyHistogram
+        self._lock = threading.Lock()
+
+    def record(self, flow, stage, seconds):
+        with self._lock:
+            h = self.histograms.get((flow, stage))
+            if h is None:
+                h = self.histograms[(flow, stage)] = LatencyHistogram()
+            h.record(seconds * 1e6)
+
+    def start(self, flow, origin=None):
+        """New trace for `flow`. `origin` is a time.monotonic() value (default: now)."""
+        if not self.enabled:
+            return NULL_TRACE
+        return Trace(self, flow, time.perf_counter() if origin is None else _from_monotonic(origin))
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+
+    def to_json(self):
+        with self._lock:
+            items = sorted(self.histograms.items())
+            out = {}
+            for (flow, stage), h in items:
+                out.setdefault(flow, {})[stage] = h.summary()
+        return out
+
+    def to_prometheus(self, name="gt7_radio_stage_seconds"):
+        lines = [
+            f"# HELP {name} Latency of each radio pipeline stage.",
+            f"# TYPE {name} summary",
+        ]
+        with self._lock:
+            for (flow, stage), h in sorted(self.histograms.items()):
+                labels = f'flow="{flow}",stage="{stage}"'
+                for q in (50, 95, 99):
+                    lines.append(f'{name}{{{labels},quantile="{q / 100}"}} {h.percentile(q) / 1e6:.6f}')
+                lines.append(f"{name}_sum{{{labels}}} {h.total / 1e6:.6f}")
+                lines.append(f"{name}_count{{{labels}}} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def table(self):
+        """Human-readable p50/p95/p99 per flow and stage."""
+        rows = []
+        for flow, stages in self.to_json().items():
+            rows.append(f"{flow}:")
+            for stage, s in stages.items():
+                rows.append(f"   {stage:<16} n={s['count']:<4} p50 {s['p50']:8.1f} ms"
+                            f"  p95 {s['p95']:8.1f} ms  p99 {s['p99']:8.1f} ms")
+        return "\n".join(rows)
+
+
+class Trace:
+    __slots__ = ("tracer", "flow", "origin")
+
+    def __init__(self, tracer, flow, origin):
+        self.tracer = tracer
+        self.flow = flow
+        self.origin = origin    # time.perf_counter()
+
+    def mark(self, stage, at=None):
+        """Record how long after the origin `stage` happened (`at`: monotonic, default now)."""
+        now = time.perf_counter() if at is None else _from_monotonic(at)
+        self.tracer.record(self.flow, stage, now - self.origin)
+
+    def span(self, stage):
+        return _Span(self, stage)
+
+
+class _Span:
+    __slots__ = ("trace", "stage", "started")
+
+    def __init__(self, trace, stage):
+        self.trace = trace
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.trace.tracer.record(self.trace.flow, self.stage, time.perf_counter() - self.started)
+
+
+class _NullTrace:
+    __slots__ = ()
+    flow = None
+
+    def mark(self, stage, at=None):
+        pass
+
+    def span(self, stage):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def __bool__(self):
+        return False
+
+
+NULL_TRACE = _NullTrace()
+
+
+def _from_monotonic(at):
+    """Map a time.monotonic() timestamp onto the perf_counter clock."""
+    return time.perf_counter() - (time.monotonic() - at)
+
+
+# ─── module-level tracer, active trace ────────────────────
+TRACER = Tracer()
+_current = contextvars.ContextVar("latency_trace", default=NULL_TRACE)
+
+
+def enable(on=True):
+    TRACER.enabled = on
+
+
+def start(flow, origin=None):
+    return TRACER.start(flow, origin)
+
+
+def current():
+    """The trace active in this context (a no-op trace if none)."""
+    return _current.get()
+
+
+@contextmanager
+def active(trace):
+    """Make `trace` the current one for this block (and tasks started in it)."""
+    token = _current.set(trace)
+    try:
+        yield trace
+    finally:
+        _current.reset(token)
+
+
+def span(stage):
+    return _current.get().span(stage)
+
+
+def mark(stage, at=None):
+    _current.get().mark(stage, at)
+
+
+def to_json():
+    return TRACER.to_json()
+
+
+def to_prometheus():
+    return TRACER.to_prometheus()
@@ -6,6 +6,7 @@ import tkinter as tk
 from tkinter import messagebox
 from pathlib import Path
 
+from telemetry_hub import HUB_HOST, HUB_PORT, TelemetryHub
 from telemetry_server import TelemetryServer
 import GT7_Radio_GenAI  # your existing module
 
@@ -22,6 +23,10 @@ logging.basicConfig(filename="engineer_log.txt", level=logging.INFO, format="%(a
 MAX_ATTEMPTS = 3
 DELAY_BETWEEN = 5  # seconds
 
+# "host:port" of a telemetry_hub already running (e.g. `python telemetry_hub.py`).
+# Unset: we own the UDP receiver and serve a hub ourselves for the HUD/recorder.
+TELEMETRY_HUB = os.getenv("GT7_TELEMETRY_HUB")
+
 
 def set_working_directory():
     # Ensure the working directory is the script's location
@@ -31,10 +36,15 @@ def set_working_directory():
 def connect_telemetry():
     tel = TelemetryServer()
     for attempt in range(1, MAX_ATTEMPTS + 1):
+        if attempt > 1:
+            tel.stop()      # drop the last attempt's receiver before binding a new one
         try:
-            tel.start()
-            time.sleep(2)  # give it a moment to receive packets
-            if tel.get_latest() is not None:
+            if TELEMETRY_HUB:
+                host, _, port = TELEMETRY_HUB.rpartition(":")
+                tel.start_from_hub(host or HUB_HOST, int(port))
+            else:
+                tel.start()
+            if tel.wait_for_packet(timeout=2):  # returns as soon as the first packet lands
                 print(f"✅ Telemetry connected on attempt {attempt}", flush=True)
                 return tel
             raise RuntimeError("no packets yet")
@@ -56,11 +66,19 @@ def show_error_popup():
 
 def main():
     set_working_directory()
+    # models and assets load in the background while we look for the PS5
+    startup = GT7_Radio_GenAI.start_background_loading()
+    started = time.perf_counter()
     tel = connect_telemetry()
+    startup.record("telemetry", time.perf_counter() - started)
     if not tel:
         show_error_popup()
         sys.exit(1)
 
+    if not TELEMETRY_HUB:
+        TelemetryHub(tel, HUB_HOST, HUB_PORT).start()
+    startup.report_when_ready(timeout=120)
+
     # Start the main application
     GT7_Radio_GenAI.run_with_telemetry(tel)
 
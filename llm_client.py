@@ -0,0 +1,107 @@
+"""
+Async, streaming LLM client for the engineer.
+
+All callouts share one AsyncOpenAI instance on top of one pooled httpx
+client, so the TLS connection to the API stays open between calls (warm it
+at race start with `warm_up()`). Every call has its own timeout and is a
+plain coroutine, so it can be cancelled without blocking the event loop.
+
+Point `base_url` (or OPENAI_BASE_URL) at any OpenAI-compatible server to run
+against a local stub:
+
+    python llm_client.py --base-url http://127.0.0.1:8000/v1 "radio check"
+"""
+import asyncio
+import os
+import time
+
+import async_timeout
+import httpx
+from openai import AsyncOpenAI
+
+DEFAULT_MODEL = "gpt-4o-mini"
+
+
+class LlmClient:
+    def __init__(self, api_key=None, base_url=None, model=DEFAULT_MODEL,
+                 timeout_sec=8.0, max_connections=8, keepalive_sec=300):
+        self.model = model
+        self.timeout_sec = timeout_sec
+        self.http = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_connections,
+                                max_keepalive_connections=max_connections,
+                                keepalive_expiry=keepalive_sec),
+            timeout=httpx.Timeout(timeout_sec, connect=3.0),
+        )
+        self.client = AsyncOpenAI(
+            api_key=api_key or os.getenv("OPENAI_API_KEY"),
+            base_url=base_url or os.getenv("OPENAI_BASE_URL"),
+            http_client=self.http,
+            max_retries=1,
+        )
+
+    async def warm_up(self):
+        """Open (and keep) a connection before the first real callout."""
+        started = time.perf_counter()
+        try:
+            async with async_timeout.timeout(self.timeout_sec):
+                await self.client.models.list()
+            print(f"🔥 LLM connection warm ({(time.perf_counter() - started) * 1000:.0f} ms)")
+        except Exception as e:
+            print(f"⚠️ LLM warm-up failed: {e}")
+
+    async def stream(self, messages, model=None, timeout_sec=None, on_usage=None, **kwargs):
+        """Yield content deltas as they arrive. `on_usage(usage)` gets the token counts at the end."""
+        if on_usage is not None:
+            kwargs["stream_options"] = {"include_usage": True}
+        async with async_timeout.timeout(timeout_sec or self.timeout_sec):
+            response = await self.client.chat.completions.create(
+                model=model or self.model,
+                messages=messages,
+                stream=True,
+                **kwargs,
+            )
+            async for chunk in response:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+                if on_usage is not None and getattr(chunk, "usage", None):
+                    on_usage(chunk.usage)
+
+    async def complete(self, messages, model=None, timeout_sec=None, on_usage=None, **kwargs):
+        """The whole reply as a string, or None if the call failed or timed out."""
+        try:
+            parts = [tok async for tok in self.stream(messages, model, timeout_sec, on_usage, **kwargs)]
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"❌ LLM call failed: {e}")
+            return None
+        return "".join(parts)
+
+    async def close(self):
+        await self.http.aclose()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Smoke-test the LLM client against an endpoint")
+    parser.add_argument("prompt")
+    parser.add_argument("--base-url")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    args = parser.parse_args()
+
+    async def main():
+        llm = LlmClient(base_url=args.base_url, model=args.model)
+        await llm.warm_up()
+        started = time.perf_counter()
+        first = None
+        async for tok in llm.stream([{"role": "user", "content": args.prompt}]):
+            if first is None:
+                first = time.perf_counter() - started
+            print(tok, end="", flush=True)
+        print(f"\nfirst token {first * 1000 if first else float('nan'):.0f} ms, "
+              f"total {(time.perf_counter() - started) * 1000:.0f} ms")
+        await llm.close()
+
+    asyncio.run(main())
@@ -0,0 +1,140 @@
+"""
+Template radio lines for the routine callouts — no LLM, no network.
+
+Fuel alerts, position changes and new best laps say nearly the same thing
+every time, so instead of a model round trip they are assembled from a
+phrasebook: each kind has a few witty variants, each variant is a list of
+fragments, and the `{slots}` are filled with spoken numbers:
+
+    ["Fuel's under", "{fuel}", "Start thinking about that box."]
+        -> "Fuel's under" + "twenty percent" + "Start thinking about that box."
+
+Every fragment is rendered once (TTS + radio filter) and cached like any
+other radio line, and a callout is those clips trimmed and spliced end to
+end, so once the bank is warm a routine callout costs a few cache lookups.
+"""
+import random
+
+import inflect
+import numpy as np
+
+GAP_MS = 40                 # silence between spliced fragments
+TRIM_RATIO = 0.04           # edge samples quieter than this fraction of the peak are cut
+MAX_POSITION = 20           # positions pre-rendered up front; higher ones render on first use
+MAX_MINUTES = 3             # lap-time minutes pre-rendered up front
+
+PHRASES = {
+    "fuel": [
+        ["Fuel's under", "{fuel}", "Start thinking about that box."],
+        ["Fuel check.", "{fuel}", "left, go easy on the right foot."],
+        ["Fuel at", "{fuel}", "It's not a buffet out there."],
+        ["Heads up, fuel is", "{fuel}", "Lift and coast where you can."],
+    ],
+    "position_gained": [
+        ["Lovely move.", "{position}", ""],
+        ["That's one more behind you.", "Up to", "{position}"],
+        ["Beautiful. You're", "{position}", "now, keep it tidy."],
+        ["Get in there!", "{position}", ""],
+    ],
+    "position_lost": [
+        ["Lost one there.", "Down to", "{position}", "Let's get it back."],
+        ["Bit of a moment.", "You're", "{position}", "now, heads down."],
+        ["They got you.", "{position}", "Plenty of race left."],
+    ],
+    "best_lap": [
+        ["Purple! New best lap,", "{lap_time}", ""],
+        ["That's your fastest yet.", "{lap_time}", "Do it again."],
+        ["New personal best.", "{lap_time}", "Lovely stuff."],
+    ],
+}
+
+_words = inflect.engine()
+
+
+def say_number(n):
+    return _words.number_to_words(n)
+
+
+def say_position(position):
+    return f"P {say_number(position)}"
+
+
+def say_fuel(percent):
+    return f"{say_number(int(percent))} percent"
+
+
+def say_seconds(seconds):
+    return f"oh {say_number(seconds)}" if seconds < 10 else say_number(seconds)
+
+
+def say_lap_time(ms):
+    """83456 -> ['one', 'twenty-three', 'point four'] (radio style: minutes, seconds, tenths).
+
+    Three clips rather than one, so ~75 of them cover every lap time.
+    """
+    minutes, rest = divmod(int(ms), 60000)
+    seconds, tenths = divmod(rest // 100, 10)
+    return [say_number(minutes), say_seconds(seconds), f"point {say_number(tenths)}"]
+
+
+class Phrasebank:
+    """
+    Picks a variant, fills its slots and splices the fragment clips.
+
+    `render(text)` is a coroutine returning the fragment as Discord PCM
+    (48 kHz stereo s16), cached by the caller. Pass a seeded `rng` (a
+    random.Random) for repeatable variant picks.
+    """
+
+    def __init__(self, render, phrases=PHRASES, rng=None):
+        self.render = render
+        self.phrases = phrases
+        self.rng = rng or random.Random()
+        self._last = {}         # kind -> variant index, so the same quip never plays twice running
+
+    def line(self, kind, position=None, fuel=None, lap_time_ms=None):
+        """The fragments of one callout, slots filled."""
+        variants = self.phrases[kind]
+        choices = [i for i in range(len(variants)) if i != self._last.get(kind)] or [0]
+        i = self.rng.choice(choices)
+        self._last[kind] = i
+        out = []
+        for fragment in variants[i]:
+            if fragment == "{position}":
+                out.append(say_position(position))
+            elif fragment == "{fuel}":
+                out.append(say_fuel(fuel))
+            elif fragment == "{lap_time}":
+                out.extend(say_lap_time(lap_time_ms))
+            elif fragment:
+                out.append(fragment)
+        return out
+
+    def fragments(self, fuel_levels=(), max_position=MAX_POSITION):
+        """Every clip the bank can need (for pre-rendering)."""
+        texts = {f for variants in self.phrases.values() for v in variants for f in v
+                 if f and not f.startswith("{")}
+        texts.update(say_position(n) for n in range(1, max_position + 1))
+        texts.update(say_fuel(level) for level in fuel_levels)
+        texts.update(say_number(m) for m in range(MAX_MINUTES + 1))
+        texts.update(say_seconds(s) for s in range(60))
+        texts.update(f"point {say_number(t)}" for t in range(10))
+        return sorted(texts)
+
+    async def render_line(self, fragments):
+        """Splice the fragment clips into one PCM line."""
+        clips = [trim(await self.render(text)) for text in fragments]
+        gap = bytes(int(48000 * GAP_MS / 1000) * 4)
+        return gap.join(c for c in clips if c)
+
+
+def trim(pcm):
+    """Cut the quiet lead-in/tail TTS leaves around a clip (whole stereo frames)."""
+    if not pcm:
+        return pcm
+    x = np.frombuffer(pcm, dtype=np.int16).reshape(-1, 2)
+    level = np.abs(x).max(axis=1)
+    loud = np.flatnonzero(level > level.max() * TRIM_RATIO)
+    if not len(loud):
+        return b""
+    return x[loud[0]:loud[-1] + 1].tobytes()
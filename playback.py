@@ -0,0 +1,184 @@
+"""
+Prioritized radio playback.
+
+Every line the engineer says goes through one RadioScheduler per voice
+connection instead of `vc.play` + wait. `submit()` only enqueues and
+returns a future, so capture, STT and telemetry checks keep running while
+audio plays. The scheduler plays one line at a time, highest class first:
+
+    DRIVER (replies to the driver) > SAFETY > FUEL > LAP (chatter) > BANTER
+
+A line at SAFETY or above that arrives while a lower class is playing
+ducks it (a short fade) and takes over; other lines just jump the queue.
+SAFETY carries the lines that must not wait behind chatter: the critical
+fuel alert and the race-finish call. Every line carries a deadline — a lap
+update that has waited behind a long reply is dropped rather than played
+late. Deadlines are checked whenever a line is queued as well as when the
+next one is picked, so pending() never shows lines that will not play.
+"""
+import asyncio
+import heapq
+import itertools
+import time
+
+import discord
+import numpy as np
+
+import latency
+from radio_pipeline import PCMAudio
+
+DRIVER, SAFETY, FUEL, LAP, BANTER = range(5)
+CLASS_NAMES = ("driver", "safety", "fuel", "lap", "banter")
+
+# how long a line of each class may wait before it is no longer worth saying
+MAX_WAIT = {DRIVER: 20.0, SAFETY: 5.0, FUEL: 20.0, LAP: 12.0, BANTER: 8.0}
+PREEMPT_AT = SAFETY         # classes at or above this interrupt lower ones
+DUCK_MS = 120               # fade-out of an interrupted line
+
+
+class _Ducking(discord.AudioSource):
+    """Wraps a source so it can be faded out mid-line; counts what was played."""
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.frames = 0
+        self._gain = 1.0
+        self._step = 0.0
+
+    def duck(self, ms=DUCK_MS):
+        self._step = 20 / max(ms, 20)
+
+    def read(self):
+        if self._gain <= 0:
+            return b""
+        frame = self.inner.read()
+        if not frame:
+            return frame
+        self.frames += 1
+        if self._step:
+            self._gain -= self._step
+            x = np.frombuffer(frame, dtype=np.int16) * max(self._gain, 0.0)
+            frame = x.astype(np.int16).tobytes()
+        return frame
+
+    def is_opus(self):
+        return False
+
+    def cleanup(self):
+        self.inner.cleanup()
+
+
+class _Line:
+    __slots__ = ("priority", "source", "deadline", "tag", "trace", "done", "outcome")
+
+    def __init__(self, priority, source, deadline, tag, trace, done):
+        self.priority = priority
+        self.source = source
+        self.deadline = deadline
+        self.tag = tag
+        self.trace = trace
+        self.done = done
+        self.outcome = "played"
+
+    def finish(self, outcome, seconds=0.0):
+        if not self.done.done():
+            self.done.set_result((outcome, seconds))
+
+
+class RadioScheduler:
+    def __init__(self, vc):
+        self.vc = vc
+        self.current = None
+        self.stats = {"played": 0, "preempted": 0, "expired": 0, "dropped": 0}
+        self._queue = []        # heap of (priority, seq, _Line)
+        self._seq = itertools.count()
+        self._wake = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        self._task = self._loop.create_task(self._run())
+
+    def submit(self, source, priority=LAP, max_wait=None, tag="", trace=None):
+        """
+        Queue a line (Discord PCM bytes or an AudioSource) without waiting.
+
+        Returns a future of (outcome, seconds played); outcome is "played",
+        "preempted", "expired" or "dropped".
+        """
+        if isinstance(source, (bytes, bytearray)):
+            source = PCMAudio(source)
+        wait = MAX_WAIT[priority] if max_wait is None else max_wait
+        now = time.monotonic()
+        self._expire(now)
+        line = _Line(priority, source, now + wait, tag,
+                     trace if trace is not None else latency.current(), self._loop.create_future())
+        heapq.heappush(self._queue, (priority, next(self._seq), line))
+        current = self.current
+        if current is not None and priority <= PREEMPT_AT and priority < current.priority:
+            current.outcome = "preempted"
+            current.source.duck()
+        self._wake.set()
+        return line.done
+
+    def _expire(self, now):
+        """Drop every queued line whose deadline has passed."""
+        if all(line.deadline >= now for _, _, line in self._queue):
+            return
+        keep = []
+        for item in self._queue:
+            if item[2].deadline >= now:
+                keep.append(item)
+            else:
+                self._drop_stale(item[2])
+        heapq.heapify(keep)
+        self._queue = keep
+
+    def _drop_stale(self, line):
+        print(f"🗑️ Dropped stale radio line ({line.tag})")
+        self.stats["expired"] += 1
+        line.finish("expired")
+
+    def clear(self):
+        """Drop everything queued and cut the current line (pause / menu)."""
+        while self._queue:
+            heapq.heappop(self._queue)[2].finish("dropped")
+            self.stats["dropped"] += 1
+        if self.current is not None:
+            self.current.outcome = "dropped"
+            self.vc.stop()
+
+    def close(self):
+        self.clear()
+        self._task.cancel()
+
+    def pending(self):
+        return [(CLASS_NAMES[p], line.tag) for p, _, line in sorted(self._queue)]
+
+    async def _run(self):
+        while True:
+            while not self._queue:
+                self._wake.clear()
+                await self._wake.wait()
+            _, _, line = heapq.heappop(self._queue)
+            if time.monotonic() > line.deadline or not self.vc.is_connected():
+                self._drop_stale(line)
+                continue
+            await self._play(line)
+
+    async def _play(self, line):
+        finished = asyncio.Event()
+        source = line.source = _Ducking(line.source)
+        self.current = line
+        try:
+            self.vc.play(source, after=lambda e: self._loop.call_soon_threadsafe(finished.set))
+        except discord.ClientException as e:     # something else grabbed the player
+            print(f"Radio line failed ({line.tag}): {e}")
+            self.current = None
+            line.finish("dropped")
+            return
+        line.trace.mark("playback_start")
+        try:
+            await finished.wait()
+        finally:
+            self.current = None
+            line.trace.mark("playback_end")
+            self.stats[line.outcome] += 1
+            line.finish(line.outcome, source.frames * 0.02)     # 20 ms frames
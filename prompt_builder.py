@@ -0,0 +1,161 @@
+"""
+Prompts for every LLM callout.
+
+Each prompt is two messages: a system message that is byte-identical for
+the whole session (persona, driver name, format rules), then a short user
+message with the telemetry and the task. Keeping the unchanging part first
+lets the provider reuse its prefix cache between callouts, and the
+telemetry line is compact and rounded instead of a Python dict repr:
+
+    lap 3/10 | P4/16 | fuel 62% (7.1%/lap, ~8 laps left) | last 1:23.4 best 1:22.9
+
+Each kind of callout only gets the channels it needs; the slow-moving car
+health readings (tyres, oil, water) are sent with routine callouts only
+when they moved since the last prompt that carried them — counting only
+prompts that were actually used (`commit`), not speculative ones that got
+thrown away. Token usage the API reports is logged per prompt and summed
+per kind.
+"""
+import threading
+
+# rounding steps for the health readings: a change smaller than this is noise
+_HEALTH_STEPS = {"tyres": 5, "oil": 5, "water": 5}
+
+# which parts of the telemetry line each kind of callout gets
+KIND_PARTS = {
+    "overtake": ("lap", "position"),
+    "lap_update": ("lap", "position", "fuel", "times", "health"),
+    # a lap update written before the line: the task carries the new lap number,
+    # and the lap just being completed has no time yet
+    "lap_update_ahead": ("position", "fuel", "health"),
+    "fuel": ("lap", "fuel"),
+    "driver_query": ("lap", "position", "fuel", "times", "speed", "health"),
+}
+# kinds that always see the health readings, changed or not
+_FULL_HEALTH = {"driver_query"}
+
+
+def static_prompt(driver_name):
+    return (
+        f"You are a witty and snarky British formula 1 engineer for a driver named {driver_name}. "
+        f"You speak in short sentences, and don't waste time while racing. "
+        f"{driver_name} is your friend so banter is welcome. "
+        "Do not use emojis or symbols. Always end on punctuation and speak in concise, complete sentences. "
+        "Say positions as P then the number with a space, like P one. "
+        "Say lap times in words, like one minute twenty three seconds. "
+        "Each message starts with a telemetry line: lap current/total | P position/cars | "
+        "fuel percent left (burn per lap, laps it lasts) | last and best lap m:ss.s | "
+        "tyre temps °C front-left, front-right, rear-left, rear-right | oil and water."
+    )
+
+
+def lap_time(ms):
+    """83456 -> '1:23.5' ('-' for no time yet)."""
+    if ms is None or ms <= 0:
+        return "-"
+    minutes, ms = divmod(int(ms), 60000)
+    return f"{minutes}:{ms / 1000:04.1f}"
+
+
+class Prompt(list):
+    """[system, user] messages, plus the health readings they carry."""
+
+    def __init__(self, messages, health):
+        super().__init__(messages)
+        self.health = health            # part -> rounded values, committed once used
+
+
+class PromptBuilder:
+    def __init__(self, driver_name):
+        self.system = {"role": "system", "content": static_prompt(driver_name)}
+        self._last_health = {}          # part -> rounded values last used
+        self._usage = {}                # kind -> [prompts, prompt tokens, cached tokens]
+        self._lock = threading.Lock()
+
+    def reset(self):
+        self._last_health.clear()
+
+    # ─── telemetry line ────────────────────────────────────
+    def stats(self, t, kind, fuel_per_lap=None, health=None):
+        """The telemetry line for one `kind` of callout. `fuel_per_lap`: % of tank, if known.
+
+        The health readings it includes are added to `health` (see `commit`).
+        """
+        if t is None:
+            return "telemetry unavailable"
+        parts = []
+        for part in KIND_PARTS.get(kind, KIND_PARTS["driver_query"]):
+            if part == "health":
+                text = self._health(t, kind, {} if health is None else health)
+            else:
+                text = getattr(self, "_" + part)(t, kind, fuel_per_lap)
+            if text:
+                parts.append(text)
+        return " | ".join(parts)
+
+    def _lap(self, t, kind, fuel_per_lap):
+        return f"lap {t.current_lap}/{t.total_laps}" if t.total_laps > 0 else f"lap {t.current_lap}"
+
+    def _position(self, t, kind, fuel_per_lap):
+        return f"P{t.race_start_pos}/{t.total_cars}" if t.total_cars > 0 else f"P{t.race_start_pos}"
+
+    def _fuel(self, t, kind, fuel_per_lap):
+        text = f"fuel {t.fuel_pct:.0f}%"
+        if fuel_per_lap:
+            text += f" ({fuel_per_lap:.1f}%/lap, ~{t.fuel_pct / fuel_per_lap:.0f} laps left)"
+        return text
+
+    def _times(self, t, kind, fuel_per_lap):
+        return f"last {lap_time(t.last_lap_time_ms)} best {lap_time(t.best_lap_time_ms)}"
+
+    def _speed(self, t, kind, fuel_per_lap):
+        return f"{t.speed_kph:.0f} kph {round(t.engine_rpm, -2):.0f} rpm"
+
+    def _health(self, t, kind, health):
+        readings = {
+            "tyres": (t.tire_fl_temp, t.tire_fr_temp, t.tire_rl_temp, t.tire_rr_temp),
+            "oil": (t.oil_temp,),
+            "water": (t.water_temp,),
+        }
+        out = []
+        for part, values in readings.items():
+            step = _HEALTH_STEPS[part]
+            rounded = tuple(round(v / step) * step for v in values)
+            if kind not in _FULL_HEALTH and self._last_health.get(part) == rounded:
+                continue
+            health[part] = rounded
+            values = "/".join(f"{v:.0f}" for v in values)
+            out.append(f"oil {values}°C {t.oil_pressure:.1f}bar" if part == "oil" else f"{part} {values}°C")
+        return " ".join(out)
+
+    # ─── messages ──────────────────────────────────────────
+    def messages(self, kind, t, task, fuel_per_lap=None):
+        """[static system prompt, telemetry line + task] for one callout."""
+        health = {}
+        stats = self.stats(t, kind, fuel_per_lap, health)
+        return Prompt([self.system, {"role": "user", "content": f"{stats}\n{task}"}], health)
+
+    def commit(self, messages):
+        """The driver gets this prompt's reply: its health readings now count as told."""
+        self._last_health.update(getattr(messages, "health", {}))
+
+    # ─── token accounting ──────────────────────────────────
+    def record_usage(self, kind, usage):
+        """Log the usage the API reported for one prompt."""
+        if usage is None:
+            return
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = getattr(details, "cached_tokens", 0) or 0
+        with self._lock:
+            totals = self._usage.setdefault(kind, [0, 0, 0])
+            totals[0] += 1
+            totals[1] += usage.prompt_tokens
+            totals[2] += cached
+        print(f"🧮 {kind}: {usage.prompt_tokens} prompt tokens ({cached} cached), "
+              f"{usage.completion_tokens} completion")
+
+    def usage_stats(self):
+        with self._lock:
+            return {kind: {"prompts": n, "prompt_tokens": tokens, "avg_prompt_tokens": round(tokens / n),
+                           "cached_tokens": cached}
+                    for kind, (n, tokens, cached) in self._usage.items()}
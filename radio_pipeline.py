@@ -0,0 +1,196 @@
+"""
+Sentence-chunked LLM -> TTS -> playback pipeline.
+
+Instead of waiting for the whole completion, then the whole synthesis, then
+playing, tokens are cut into sentences as they stream in. Each sentence is
+rendered (TTS + radio filter) while the next one is still being generated,
+and the rendered PCM is appended to one long-lived Discord AudioSource, so
+the driver hears sentence one while sentence two is still in the works and
+the clips join without a gap.
+"""
+import asyncio
+import re
+import threading
+import time
+from collections import deque
+
+import discord
+
+import latency
+
+# Discord wants 20 ms of 48 kHz stereo s16: 960 samples * 2 ch * 2 bytes
+FRAME_BYTES = 3840
+SILENCE = bytes(FRAME_BYTES)
+
+# stream_to_voice timing names -> latency stages
+_TRACE_STAGES = {"first_token": "llm_first_token", "llm_done": "llm_done"}
+
+# end of a sentence: . ! ? (optionally followed by quotes/brackets) then whitespace
+_SENTENCE_END = re.compile(r"[.!?][\"')\]]*\s")
+
+
+async def split_sentences(tokens, min_chars=12):
+    """Regroup an async stream of tokens into whole sentences."""
+    buf = ""
+    async for tok in tokens:
+        buf += tok
+        while True:
+            m = _SENTENCE_END.search(buf, min_chars)
+            if not m:
+                break
+            sentence, buf = buf[:m.end()].strip(), buf[m.end():]
+            if sentence:
+                yield sentence
+    if buf.strip():
+        yield buf.strip()
+
+
+class PCMQueueSource(discord.AudioSource):
+    """
+    AudioSource fed from the event loop while Discord's player thread reads.
+
+    Plays silence while waiting for the next chunk, and ends once `close()`
+    has been called and everything queued has been played.
+    """
+
+    def __init__(self):
+        self._chunks = deque()
+        self._offset = 0
+        self._queued = 0
+        self._lock = threading.Lock()
+        self._closed = False
+        self.first_frame_at = None
+
+    def feed(self, pcm):
+        with self._lock:
+            self._chunks.append(pcm)
+            self._queued += len(pcm)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+
+    def read(self):
+        with self._lock:
+            if self._queued < FRAME_BYTES:
+                if not self._closed:
+                    return SILENCE          # next sentence still rendering
+                if not self._queued:
+                    return b""
+            out = bytearray()
+            while len(out) < FRAME_BYTES and self._chunks:
+                chunk = self._chunks[0]
+                take = min(FRAME_BYTES - len(out), len(chunk) - self._offset)
+                out += chunk[self._offset:self._offset + take]
+                self._offset += take
+                if self._offset == len(chunk):
+                    self._chunks.popleft()
+                    self._offset = 0
+            self._queued -= len(out)
+        if self.first_frame_at is None:
+            self.first_frame_at = time.perf_counter()
+        return bytes(out.ljust(FRAME_BYTES, b"\0"))
+
+    def is_opus(self):
+        return False
+
+
+class PCMAudio(discord.AudioSource):
+    """
+    Plays a finished 48 kHz stereo s16 buffer straight from memory.
+
+    No temp file, no FFmpeg process: read() hands out 20 ms slices of the
+    buffer we already have.
+    """
+
+    def __init__(self, pcm):
+        self._pcm = bytes(pcm)
+        self._pos = 0
+
+    @property
+    def duration(self):
+        return len(self._pcm) / (FRAME_BYTES * 50)
+
+    def read(self):
+        # the opus encoder ctypes-casts what we return, so hand out real bytes
+        frame = self._pcm[self._pos:self._pos + FRAME_BYTES]
+        self._pos += FRAME_BYTES
+        if len(frame) == FRAME_BYTES or not frame:
+            return frame
+        return frame.ljust(FRAME_BYTES, b"\0")
+
+    def is_opus(self):
+        return False
+
+
+async def stream_to_voice(vc, tokens, render, play, prefix=None, suffix=None):
+    """
+    Speak an LLM token stream on `vc`, sentence by sentence.
+
+    `render(sentence)` returns 48 kHz stereo s16 PCM. It may be a coroutine
+    function; a plain function runs in the default executor. Sentences keep
+    being read off the token stream while earlier ones render.
+    `play(source)` hands the growing source to the playback scheduler as
+    soon as the first sentence is rendered; the call returns once the text
+    is complete, without waiting for the audio to finish.
+    `prefix`/`suffix` are PCM clips (radio clicks) played around the speech.
+    Returns (full_text, timings) with timings in ms from the start of the call.
+    """
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+    timings = {}
+    trace = latency.current()
+
+    def mark(name):
+        if name not in timings:
+            timings[name] = round((time.perf_counter() - started) * 1000)
+            if name in _TRACE_STAGES:
+                trace.mark(_TRACE_STAGES[name])
+
+    async def timed_tokens():
+        async for tok in tokens:
+            mark("first_token")
+            yield tok
+        mark("llm_done")
+
+    pending = asyncio.Queue()
+    sentences = []
+
+    async def produce():
+        try:
+            async for sentence in split_sentences(timed_tokens()):
+                mark("first_sentence")
+                sentences.append(sentence)
+                pending.put_nowait(sentence)
+        finally:
+            pending.put_nowait(None)
+
+    source = PCMQueueSource()
+    playing = False
+    producer = asyncio.create_task(produce())
+
+    if prefix:
+        source.feed(prefix)
+    try:
+        while (sentence := await pending.get()) is not None:
+            if asyncio.iscoroutinefunction(render):
+                pcm = await render(sentence)
+            else:
+                pcm = await loop.run_in_executor(None, render, sentence)
+            mark("first_render")
+            if pcm:
+                source.feed(pcm)
+            if not playing and vc.is_connected():
+                play(source)
+                mark("queued")
+                playing = True
+        await producer      # surface LLM errors
+    finally:
+        producer.cancel()
+        if suffix:
+            source.feed(suffix)
+        source.close()
+
+    if source.first_frame_at is not None:
+        timings["first_audio"] = round((source.first_frame_at - started) * 1000)
+    return " ".join(sentences), timings
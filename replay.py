@@ -0,0 +1,587 @@
+"""
+Headless, deterministic replay of a race through the engineer's radio logic.
+
+Plays a recorded session (see telemetry_recorder) or a synthetic race into
+`handle_engineer_flow`, with stub Discord voice, LLM and TTS backends, and
+returns the timeline of radio callouts that would have fired.
+
+Everything runs on virtual time: the event loop's clock, and the `time`
+module as seen by the engine, only move when the loop would otherwise wait,
+so the same session always produces the same timeline. With `speed=None` a
+whole race replays in seconds; `speed=1` (or N) paces it against the wall
+clock instead.
+
+    python replay.py sessions/session_20250101_200000.gt7rec
+    python replay.py --synthetic --laps 5 --json
+"""
+import argparse
+import asyncio
+import contextlib
+import contextvars
+import io
+import json
+import random
+import selectors
+import sys
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+import GT7_Radio_GenAI as engine
+import latency
+import playback
+import radio_pipeline
+import speculation
+import telemetry_snapshot
+from phrasebank import Phrasebank
+from playback import RadioScheduler
+from prompt_builder import PromptBuilder
+from radio_pipeline import FRAME_BYTES
+from startup import LazyHandle
+from telemetry_history import HISTORY_DTYPE, TelemetryHistory
+from telemetry_recorder import RecordedSession
+from telemetry_snapshot import FIELDS, TelemetrySnapshot
+
+EPOCH = 1_700_000_000.0     # virtual wall clock at the start of every replay
+
+# module globals handle_engineer_flow keeps between iterations – reset per replay
+_FLOW_STATE = ("voice_conn", "session")
+_initial_state = {name: getattr(engine, name) for name in _FLOW_STATE}
+
+
+# ─── virtual time ──────────────────────────────────────────
+class VirtualClock:
+    def __init__(self, start=1000.0):
+        self.now = start
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class _ClockTime:
+    """Stands in for the `time` module inside the engine while replaying."""
+
+    def __init__(self, clock):
+        self._clock = clock
+
+    def monotonic(self):
+        return self._clock.now
+
+    perf_counter = monotonic
+
+    def time(self):
+        return EPOCH + self._clock.now
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+class _VirtualSelector(selectors.DefaultSelector):
+    """Jumps the clock forward instead of sleeping (or sleeps 1/speed as long)."""
+
+    def __init__(self, clock, speed):
+        super().__init__()
+        self.clock = clock
+        self.speed = speed
+
+    def select(self, timeout=None):
+        if timeout is None or timeout <= 0:
+            return super().select(timeout)
+        if not self.speed:
+            ready = super().select(0)
+            if not ready:
+                self.clock.advance(timeout)
+            return ready
+        started = time.monotonic()
+        ready = super().select(timeout / self.speed)
+        self.clock.advance(timeout if not ready else (time.monotonic() - started) * self.speed)
+        return ready
+
+
+class VirtualTimeLoop(asyncio.SelectorEventLoop):
+    def __init__(self, clock, speed=None):
+        super().__init__(_VirtualSelector(clock, speed))
+        self.clock = clock
+
+    def time(self):
+        return self.clock.now
+
+
+# ─── telemetry source ──────────────────────────────────────
+class ReplayTelemetry:
+    """
+    Same interface as TelemetryServer, fed from recorded rows on virtual time.
+
+    Runs entirely on the event loop, so callbacks and waiters fire inline.
+    """
+
+    def __init__(self, records, clock):
+        self.records = records
+        self.clock = clock
+        self.latest = None
+        self.seq = 0
+        self.history = TelemetryHistory()
+        self.running = False
+        self.finished = None
+        self._fields = [name for name in records.dtype.names if name in FIELDS]
+        self._callbacks = []
+        self._waiters = []      # [key, baseline, future]
+        self._task = None
+
+    def start(self):
+        loop = asyncio.get_running_loop()
+        self.running = True
+        self.finished = loop.create_future()
+        self._task = loop.create_task(self._pump())
+
+    def stop(self):
+        self.running = False
+        if self._task:
+            self._task.cancel()
+        waiters, self._waiters = self._waiters, []
+        for _, _, fut in waiters:
+            if not fut.done():
+                fut.set_result(None)
+
+    async def _pump(self):
+        loop = asyncio.get_running_loop()
+        if len(self.records):
+            start, first = loop.time(), float(self.records["t"][0])
+            for row in self.records:
+                delay = start + (float(row["t"]) - first) - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                self._publish(row)
+        self.finished.set_result(self.seq)
+
+    def _publish(self, row):
+        self.seq += 1
+        t = TelemetrySnapshot(self.seq, self.clock.now, **{name: row[name].item() for name in self._fields})
+        self.latest = t
+        self.history.append(t, t.received_at)
+        for waiter in list(self._waiters):
+            key, baseline, fut = waiter
+            if key is None or key(t) != baseline:
+                self._waiters.remove(waiter)
+                if not fut.done():
+                    fut.set_result(t)
+        for cb in list(self._callbacks):
+            cb(t)
+
+    def get_latest(self):
+        return self.latest
+
+    def is_stale(self, max_age=engine.STALE_AFTER):
+        t = self.latest
+        return t is None or t.is_stale(max_age)
+
+    def subscribe(self, callback):
+        self._callbacks.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._callbacks:
+            self._callbacks.remove(callback)
+
+    def wait_for_packet(self, timeout=None):
+        # can't block the loop that feeds us – just report whether one has arrived
+        return self.latest is not None
+
+    async def wait_for_update(self, key=None, timeout=None, since=None):
+        latest = self.latest
+        if latest is not None and since is not None and latest.seq > since.seq:
+            if key is None or key(latest) != key(since):
+                return latest
+        seen = since if since is not None else latest
+        fut = asyncio.get_running_loop().create_future()
+        if key is not None and seen is None:
+            key = None
+        waiter = [key, key(seen) if key else None, fut]
+        self._waiters.append(waiter)
+        try:
+            return await asyncio.wait_for(fut, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    async def updates(self, key=None):
+        last = None
+        while self.running:
+            t = await self.wait_for_update(key=key, since=last)
+            if t is not None:
+                last = t
+                yield t
+
+
+# ─── stub backends ─────────────────────────────────────────
+class StubVoiceClient:
+    """Discord voice client that 'plays' audio by draining it on virtual time."""
+
+    def __init__(self):
+        self.plays = []         # [started_at, seconds]
+        self._connected = True
+        self._listening = False
+        self._current = None
+
+    def is_connected(self):
+        return self._connected
+
+    def disconnect(self):
+        self._connected = False
+        self.stop()
+
+    def is_playing(self):
+        return self._current is not None and not self._current.done()
+
+    def is_listening(self):
+        return self._listening
+
+    def listen(self, sink):
+        self._listening = True
+
+    def stop(self):
+        if self.is_playing():
+            self._current.cancel()
+
+    def play(self, source, after=None):
+        entry = [asyncio.get_running_loop().time(), 0.0]
+        self.plays.append(entry)
+        self._current = asyncio.get_running_loop().create_task(self._drain(source, after, entry))
+
+    async def _drain(self, source, after, entry):
+        try:
+            while True:
+                # 10 frames (200 ms) per step keeps long races cheap to replay
+                frames = 0
+                while frames < 10 and source.read():
+                    frames += 1
+                entry[1] += frames * 0.02
+                if frames < 10:
+                    break
+                await asyncio.sleep(0.2)
+        finally:
+            if after:
+                after(None)
+
+
+class StubSink:
+    """Voice sink where the driver never speaks."""
+
+    def __init__(self, loop=None, **kwargs):
+        pass
+
+    def reset(self):
+        pass
+
+    async def next_utterance(self, timeout=None):
+        await asyncio.sleep(timeout or 1)
+        return None
+
+
+class StubLlm:
+    """Answers every prompt with `reply(messages)` after a fixed, virtual delay."""
+
+    def __init__(self, reply=None, first_token_s=0.4, tokens_per_s=40.0):
+        self.reply = reply or (lambda messages: "Copy that, all looking good out there.")
+        self.first_token_s = first_token_s
+        self.tokens_per_s = tokens_per_s
+        self.prompts = []
+
+    async def warm_up(self):
+        pass
+
+    async def complete(self, messages, on_usage=None):
+        text = self.reply(messages)
+        self.prompts.append(messages)
+        await asyncio.sleep(self.first_token_s + len(text.split()) / self.tokens_per_s)
+        if on_usage:
+            on_usage(self.usage(messages, text))
+        return text
+
+    async def stream(self, messages, on_usage=None):
+        text = self.reply(messages)
+        self.prompts.append(messages)
+        await asyncio.sleep(self.first_token_s)
+        for word in text.split(" "):
+            yield word + " "
+            await asyncio.sleep(1 / self.tokens_per_s)
+        if on_usage:
+            on_usage(self.usage(messages, text))
+
+    @staticmethod
+    def usage(messages, text):
+        """Rough token counts (~4 characters a token) in the shape the API reports."""
+        prompt = sum(len(m["content"]) for m in messages) // 4
+        return SimpleNamespace(prompt_tokens=prompt, completion_tokens=len(text) // 4,
+                               prompt_tokens_details=None)
+
+
+class StubTts:
+    """Silence as long as the line would take to say, after a fixed render delay."""
+
+    def __init__(self, seconds_per_word=0.3, render_s=0.15):
+        self.seconds_per_word = seconds_per_word
+        self.render_s = render_s
+        self.requests = 0
+
+    def _silence(self, text):
+        frames = int(len(text.split()) * self.seconds_per_word * 50)
+        return bytes(frames * FRAME_BYTES)
+
+    async def render(self, text, timeout_sec=10):
+        self.requests += 1
+        await asyncio.sleep(self.render_s)
+        return self._silence(text)
+
+    async def synthesize(self, text, cache_tag="engineer", retries=3, timeout_sec=10):
+        return await self.render(text, timeout_sec)
+
+    def stats(self):
+        return {"requests": self.requests}
+
+
+class _StubAssets:
+    click_in = bytes(10 * FRAME_BYTES)
+    click_out = bytes(25 * FRAME_BYTES)
+    message_received = None
+
+
+def _ready(name, value):
+    handle = LazyHandle(name, lambda: value)
+    handle.load()
+    return handle
+
+
+# ─── synthetic sessions ────────────────────────────────────
+def synthetic_race(laps=5, cars=12, start_pos=8, lap_seconds=90.0, fuel_per_lap=12.0,
+                   rate=60, seed=0):
+    """
+    A plausible race as recorded rows: loading, grid, `laps` laps with some
+    position changes and lap-time spread, the finish, then back to the menu.
+    """
+    rng = np.random.default_rng(seed)
+    lap_times = lap_seconds * (1 + rng.normal(0, 0.015, laps))
+    phases = [("loading", 3.0), ("grid", 5.0)]
+    phases += [(lap, float(s)) for lap, s in enumerate(lap_times, start=1)]
+    phases += [("finished", 6.0), ("menu", 6.0)]
+
+    n = int(sum(s for _, s in phases) * rate)
+    rows = np.zeros(n, dtype=HISTORY_DTYPE)
+    rows["t"] = np.arange(n) / rate
+    rows["packet_id"] = np.arange(n) + 1
+    rows["total_laps"] = laps
+    rows["total_cars"] = cars
+    rows["fuel_capacity"] = 100.0
+    rows["fuel_level"] = 100.0
+    rows["race_start_pos"] = start_pos
+    rows["best_lap_time_ms"] = -1
+    rows["last_lap_time_ms"] = -1
+    rows[["tire_fl_temp", "tire_fr_temp", "tire_rl_temp", "tire_rr_temp"]] = (78.0, 78.0, 74.0, 74.0)
+    rows[["oil_pressure", "water_temp", "oil_temp"]] = (4.8, 85.0, 105.0)
+
+    i = 0
+    pos = start_pos
+    best = -1
+    last = -1
+    fuel = 100.0
+    for phase, seconds in phases:
+        j = min(n, i + int(seconds * rate))
+        block = rows[i:j]
+        if phase == "loading":
+            block["flags"] = 1 << 2
+        elif phase == "grid":
+            block["flags"] = 1
+        elif phase == "finished":
+            block["flags"] = 1
+            block["current_lap"] = laps + 1
+        elif phase == "menu":
+            block["flags"] = 0
+            block["total_cars"] = -1
+        else:
+            lap = phase
+            block["flags"] = 1
+            block["current_lap"] = lap
+            phase_t = np.arange(len(block)) / rate
+            block["speed_mps"] = 45 + 20 * np.sin(phase_t / seconds * 2 * np.pi * 8)
+            block["engine_rpm"] = 5500 + 1500 * np.sin(phase_t / seconds * 2 * np.pi * 8)
+            block["throttle"] = 200
+            block["fuel_level"] = fuel - fuel_per_lap * phase_t / seconds
+            block["position_x"] = 500 * np.cos(phase_t / seconds * 2 * np.pi)
+            block["position_z"] = 500 * np.sin(phase_t / seconds * 2 * np.pi)
+            block["last_lap_time_ms"] = last
+            block["best_lap_time_ms"] = best
+            # a position change or two per lap, at deterministic random points
+            block["race_start_pos"] = pos       # carry over where the last lap ended
+            for _ in range(rng.integers(0, 3)):
+                at = int(rng.uniform(0.1, 0.9) * len(block))
+                pos = int(np.clip(pos + rng.choice((-1, 1)), 1, cars))
+                block["race_start_pos"][at:] = pos
+            pos = int(block["race_start_pos"][-1])
+            fuel -= fuel_per_lap
+            last = int(seconds * 1000)
+            best = last if best == -1 else min(best, last)
+        if phase in ("finished", "menu"):
+            block["race_start_pos"] = pos
+            block["fuel_level"] = fuel
+            block["last_lap_time_ms"] = last
+            block["best_lap_time_ms"] = best
+        i = j
+    return rows
+
+
+# ─── driver ────────────────────────────────────────────────
+_callout = contextvars.ContextVar("replay_callout", default=None)
+
+
+class _TimelineScheduler(RadioScheduler):
+    """Credits what the scheduler actually played to the callout that queued it."""
+
+    def submit(self, *args, **kwargs):
+        done = super().submit(*args, **kwargs)
+        entry = _callout.get()
+        if entry is not None:
+            done.add_done_callback(lambda f: _played(entry, *f.result()))
+        return done
+
+
+def _played(entry, outcome, seconds):
+    entry["outcome"] = outcome
+    entry["audio_s"] = round(entry["audio_s"] + seconds, 2)
+    entry["spoken"] = entry["spoken"] or seconds > 0
+
+
+async def _replay(records, clock, llm, tts, tail, seed):
+    telemetry = ReplayTelemetry(records, clock)
+    vc = StubVoiceClient()
+    timeline = []
+
+    def traced(fn, text_of):
+        async def wrapper(vc, arg, cache_tag, **kwargs):
+            if _callout.get() is not None:      # nested in a callout (per task)
+                return await fn(vc, arg, cache_tag, **kwargs)
+            t = telemetry.get_latest()
+            entry = {
+                "at": round(asyncio.get_running_loop().time() - telemetry_start, 3),
+                "tag": cache_tag,
+                "lap": t.current_lap if t else None,
+                "position": t.race_start_pos if t else None,
+                "fuel_pct": round(t.fuel_pct, 1) if t else None,
+                "spoken": False,        # filled in when the scheduler has played it
+                "outcome": None,
+                "audio_s": 0.0,
+            }
+            token = _callout.set(entry)
+            try:
+                result = await fn(vc, arg, cache_tag, **kwargs)
+            finally:
+                _callout.reset(token)
+            entry["text"] = text_of(arg, result)
+            timeline.append(entry)
+            return result
+        return wrapper
+
+    with contextlib.ExitStack() as stack:
+        def patch(obj, name, value):
+            if hasattr(obj, name):
+                stack.callback(setattr, obj, name, getattr(obj, name))
+            else:
+                stack.callback(delattr, obj, name)
+            setattr(obj, name, value)
+
+        clock_time = _ClockTime(clock)
+        for module in (engine, radio_pipeline, telemetry_snapshot, latency, speculation, playback):
+            patch(module, "time", clock_time)
+        for name, value in _initial_state.items():
+            patch(engine, name, set(value) if isinstance(value, set) else value)
+        patch(engine, "telemetry", telemetry)
+        patch(engine, "prompts", PromptBuilder(engine.driver_name))
+        patch(engine, "speculator", speculation.Speculator(lead_s=engine.SPECULATE_LEAD_S))
+        patch(engine, "phrasebank", Phrasebank(engine.fragment_pcm, rng=random.Random(seed)))
+        patch(engine, "llm", _ready("llm", llm))
+        patch(engine, "tts_pool", _ready("tts", tts))
+        patch(engine, "radio_assets", _ready("radio_assets", _StubAssets()))
+        patch(engine, "UtteranceSink", StubSink)
+        patch(engine, "RadioScheduler", _TimelineScheduler)
+        patch(engine, "render_radio_pcm", tts.render)
+        patch(engine, "synthesize_response", tts.synthesize)
+        patch(engine, "play_line", traced(engine.play_line, lambda text, result: text))
+        patch(engine, "speak_llm", traced(engine.speak_llm, lambda messages, result: result))
+        patch(engine, "play_phrase", traced(engine.play_phrase, lambda kind, result: result))
+        patch(engine, "audio_cache", engine.AudioCache(disk_dir=None))     # keep stub audio off disk
+
+        telemetry_start = asyncio.get_running_loop().time()
+        telemetry.start()
+        flow = asyncio.create_task(engine.handle_engineer_flow(vc))
+        await asyncio.wait({telemetry.finished, flow}, return_when=asyncio.FIRST_COMPLETED)
+        if not flow.done():
+            await asyncio.sleep(tail)
+        vc.disconnect()
+        try:
+            await asyncio.wait_for(flow, 30)
+        finally:
+            telemetry.stop()
+    return timeline
+
+
+def replay(source, speed=None, llm=None, tts=None, tail=10.0, quiet=True, seed=0):
+    """
+    Run `source` (a RecordedSession, a session path, or rows with the
+    HISTORY_DTYPE layout) through handle_engineer_flow.
+
+    `speed`: None replays as fast as possible, 1 is real time, N is N× real
+    time. `seed` fixes the phrasebank's variant picks. Returns the callout
+    timeline as a list of dicts.
+    """
+    if isinstance(source, str):
+        source = RecordedSession(source)
+    records = source.records if isinstance(source, RecordedSession) else source
+    clock = VirtualClock()
+    loop = VirtualTimeLoop(clock, speed)
+    out = io.StringIO() if quiet else sys.stdout
+    try:
+        with contextlib.redirect_stdout(out):
+            return loop.run_until_complete(
+                _replay(records, clock, llm or StubLlm(), tts or StubTts(), tail, seed))
+    finally:
+        loop.close()
+
+
+def format_timeline(timeline):
+    lines = []
+    for c in timeline:
+        m, s = divmod(c["at"], 60)
+        mark = " " if c["spoken"] else "x"
+        if c["outcome"] not in (None, "played"):
+            mark += f" [{c['outcome']}]"
+        lines.append(f"{int(m):3d}:{s:04.1f} {mark} L{c['lap']} P{c['position']} "
+                     f"fuel {c['fuel_pct']}%  {c['tag']:<18} {c['text']}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a race through the engineer, headless.")
+    parser.add_argument("session", nargs="?", help="recorded .gt7rec session")
+    parser.add_argument("--synthetic", action="store_true", help="replay a generated race instead")
+    parser.add_argument("--laps", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--speed", type=float, default=0, help="1 = real time, N = N× (default: as fast as possible)")
+    parser.add_argument("--json", action="store_true", help="print the timeline as JSON")
+    parser.add_argument("--verbose", action="store_true", help="show the engine's own output")
+    args = parser.parse_args()
+    if not args.synthetic and not args.session:
+        parser.error("give a session file or --synthetic")
+
+    source = synthetic_race(laps=args.laps, seed=args.seed) if args.synthetic else args.session
+    started = time.perf_counter()
+    timeline = replay(source, speed=args.speed or None, quiet=not args.verbose, seed=args.seed)
+    if args.json:
+        print(json.dumps(timeline, indent=2))
+    else:
+        print(format_timeline(timeline))
+        print(f"{len(timeline)} callouts, replayed in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
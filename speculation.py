@@ -0,0 +1,132 @@
+"""
+Speculative pre-generation of the next callout.
+
+Lap updates used to start generating only once `current_lap` ticked over,
+so the line landed seconds after the driver crossed the line; fuel alerts
+likewise waited for the threshold. A Speculator starts the LLM + TTS work
+a few seconds *before* the predicted event and parks the result in a
+short-lived slot:
+
+    speculator.want("lap_update", next_lap, signature, generate)   # every loop
+    text = await speculator.take("lap_update", lap, signature)      # on the event
+
+`take` hands the slot over the moment the event is confirmed (waiting for
+it if it is still in flight, which still beats starting from scratch). A
+slot whose `signature` — the stats its text was written from — has drifted
+is regenerated while there is time, or discarded; one nobody claims before
+it expires is dropped. Hits, misses and wasted generations are counted.
+"""
+import asyncio
+import time
+
+LEAD_SECONDS = 6.0          # start this long before the predicted event
+SLOT_GRACE = 10.0           # a slot lives this long past its predicted time
+
+
+def seconds_to_lap_end(t, history):
+    """Predicted seconds until the line, from the last lap time (None if unknown)."""
+    if t.last_lap_time_ms <= 0:
+        return None
+    run = history.lap(t.current_lap)
+    if not len(run):
+        return None
+    return t.last_lap_time_ms / 1000 - (t.received_at - float(run["t"][0]))
+
+
+def seconds_to_fuel(t, level, fuel_per_lap):
+    """Predicted seconds until fuel drops to `level` %, from the burn per lap (None if unknown)."""
+    if not fuel_per_lap or t.last_lap_time_ms <= 0:
+        return None
+    return (t.fuel_pct - level) / (fuel_per_lap / (t.last_lap_time_ms / 1000))
+
+
+class _Slot:
+    __slots__ = ("key", "signature", "task", "expires", "started")
+
+    def __init__(self, key, signature, task, expires):
+        self.key = key
+        self.signature = signature
+        self.task = task
+        self.expires = expires
+        self.started = time.monotonic()
+
+
+class Speculator:
+    def __init__(self, lead_s=LEAD_SECONDS, grace_s=SLOT_GRACE):
+        self.lead_s = lead_s
+        self.grace_s = grace_s
+        self.slots = {}         # kind -> _Slot (one pending event per kind)
+        self.started = 0
+        self.hits = 0
+        self.misses = 0         # event fired with nothing usable in its slot
+        self.wasted = 0         # generations thrown away (drifted, expired, wrong event)
+        self.waited = 0         # hits that were still generating when claimed
+
+    def want(self, kind, key, signature, generate, eta):
+        """
+        Keep a generation for event `key` of `kind` running if it is due
+        within the lead time. `generate()` returns a coroutine; it is only
+        called when a (new) generation starts.
+        """
+        if eta is None or eta > self.lead_s:
+            return
+        slot = self.slots.get(kind)
+        if slot is not None and slot.key == key and slot.signature == signature:
+            return
+        if slot is not None:
+            self.discard(kind)      # a different event, or the stats moved under it
+        self.slots[kind] = _Slot(key, signature, asyncio.ensure_future(generate()),
+                                 time.monotonic() + max(eta, 0) + self.grace_s)
+        self.started += 1
+
+    async def take(self, kind, key, signature):
+        """The pre-generated result for this event, or None (generate it the normal way)."""
+        slot = self.slots.pop(kind, None)
+        if slot is None or slot.key != key or slot.signature != signature:
+            if slot is not None:
+                self._drop(slot)
+            self.misses += 1
+            return None
+        if not slot.task.done():
+            self.waited += 1
+        try:
+            result = await slot.task
+        except Exception as e:
+            print(f"⚠️ Speculative {kind} failed: {e}")
+            result = None
+        if result is None:
+            self.wasted += 1
+            self.misses += 1
+            return None
+        self.hits += 1
+        return result
+
+    def discard(self, kind):
+        """The event happened but can't use the slot (or won't happen)."""
+        slot = self.slots.pop(kind, None)
+        if slot is not None:
+            self._drop(slot)
+
+    def expire(self):
+        now = time.monotonic()
+        for kind in [k for k, s in self.slots.items() if s.expires < now]:
+            self.discard(kind)
+
+    def reset(self):
+        for kind in list(self.slots):
+            self.discard(kind)
+
+    def _drop(self, slot):
+        slot.task.cancel()
+        self.wasted += 1
+
+    def stats(self):
+        claimed = self.hits + self.misses
+        return {
+            "started": self.started,
+            "hits": self.hits,
+            "waited": self.waited,
+            "misses": self.misses,
+            "wasted": self.wasted,
+            "hit_rate": f"{self.hits / claimed:.0%}" if claimed else "n/a",
+        }
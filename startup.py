@@ -0,0 +1,133 @@
+"""
+Lazy, parallel startup.
+
+Every expensive piece of the engineer (Whisper, Coqui, the OpenAI client,
+audio assets) sits behind a LazyHandle. `Startup.start_all()` loads them all
+at once on background threads — typically while the launcher is still
+looking for the PS5 — and each capability can be checked (`.loaded`) or
+awaited (`await handle.wait_loaded()`) on its own, so e.g. radio callouts
+don't have to wait for speech recognition.
+
+Attribute access on a handle is forwarded to the loaded object so call
+sites read the same as before. It never blocks: before the object is
+ready it raises, so check `.loaded` (or await it) first.
+"""
+import asyncio
+import threading
+import time
+
+
+class LazyHandle:
+    def __init__(self, name, loader):
+        self._name = name
+        self._loader = loader
+        self._value = None
+        self._error = None
+        self._done = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.started_at = None
+        self.elapsed = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=f"load-{self._name}", daemon=True)
+                self._thread.start()
+        return self
+
+    def _run(self):
+        self.started_at = time.perf_counter()
+        try:
+            self._value = self._loader()
+        except Exception as e:
+            self._error = e
+            print(f"❌ Failed to load {self._name}: {e}")
+        self.elapsed = time.perf_counter() - self.started_at
+        self._done.set()
+
+    @property
+    def loaded(self):
+        return self._done.is_set() and self._error is None
+
+    @property
+    def failed(self):
+        return self._error is not None
+
+    def load(self, timeout=None):
+        """Blocking: start if needed, wait, return the object."""
+        self.start()
+        if not self._done.wait(timeout):
+            raise TimeoutError(f"{self._name} still loading")
+        if self._error is not None:
+            raise self._error
+        return self._value
+
+    async def wait_loaded(self, timeout=None):
+        """Await the object without blocking the event loop."""
+        if self._done.is_set():
+            return self.load()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.load, timeout)
+
+    def __getattr__(self, attr):
+        # only called for attributes the handle itself doesn't have
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        if self._error is not None:
+            raise RuntimeError(f"{self._name} failed to load") from self._error
+        if not self._done.is_set():
+            raise RuntimeError(f"{self._name} still loading")
+        return getattr(self._value, attr)
+
+
+class Startup:
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self.handles = {}
+        self.timings = {}       # things timed outside a handle, e.g. telemetry discovery
+
+    def lazy(self, name, loader):
+        handle = LazyHandle(name, loader)
+        self.handles[name] = handle
+        return handle
+
+    def start_all(self):
+        for handle in self.handles.values():
+            handle.start()
+
+    def record(self, name, seconds):
+        self.timings[name] = seconds
+
+    def wait_all(self, timeout=None):
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        for handle in self.handles.values():
+            left = None if deadline is None else max(0.0, deadline - time.perf_counter())
+            try:
+                handle.load(left)
+            except Exception:
+                pass
+
+    def report(self):
+        """Print per-component load times against the wall clock."""
+        rows = dict(self.timings)
+        for name, handle in self.handles.items():
+            if handle.elapsed is not None:
+                rows[name] = handle.elapsed
+        wall = time.perf_counter() - self.t0
+        print("⏱️ Startup breakdown:")
+        for name, seconds in sorted(rows.items(), key=lambda kv: -kv[1]):
+            state = "failed" if name in self.handles and self.handles[name].failed else ""
+            print(f"   {name:<18} {seconds:6.2f}s {state}")
+        pending = [n for n, h in self.handles.items() if h.elapsed is None]
+        if pending:
+            print(f"   still loading: {', '.join(pending)}")
+        print(f"   {'sum (serial)':<18} {sum(rows.values()):6.2f}s")
+        print(f"   {'wall clock':<18} {wall:6.2f}s")
+
+    def report_when_ready(self, timeout=None):
+        """Print the report from a background thread once every handle has settled."""
+        def run():
+            self.wait_all(timeout)
+            self.report()
+        threading.Thread(target=run, name="startup-report", daemon=True).start()
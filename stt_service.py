@@ -0,0 +1,184 @@
+"""
+Speech-to-text worker for faster-whisper.
+
+One long-lived thread owns the WhisperModel(s), loads them once, runs a
+warm-up decode, then serves requests from a queue. Audio goes in as 16 kHz
+mono float32 NumPy buffers — no WAV file round trip — and decoded segments
+are pushed back to the event loop as they come off the generator, so callers
+can act on partial text before the whole utterance is decoded.
+
+Decoding settings are picked per request kind (see PROFILES): quick greedy
+passes for trigger checks, beam search for real questions.
+"""
+import asyncio
+import queue
+import re
+import threading
+import time
+
+import numpy as np
+
+# kind -> model size + transcribe() kwargs
+PROFILES = {
+    "trigger": {
+        "model": "tiny",
+        "beam_size": 1,
+        "best_of": 1,
+        "temperature": 0.0,
+        "without_timestamps": True,
+        "condition_on_previous_text": False,
+    },
+    "query": {
+        "model": "tiny",
+        "beam_size": 5,
+    },
+}
+
+_DONE = object()
+
+
+class _Job:
+    __slots__ = ("audio", "kind", "options", "loop", "out", "cancelled", "queued_at")
+
+    def __init__(self, audio, kind, options, loop, out):
+        self.audio = audio
+        self.kind = kind
+        self.options = options
+        self.loop = loop
+        self.out = out
+        self.cancelled = threading.Event()
+        self.queued_at = time.monotonic()
+
+
+class SttService:
+    def __init__(self, compute_type="int8", language="en", profiles=None, preload=("tiny",)):
+        self.compute_type = compute_type
+        self.language = language
+        self.profiles = dict(PROFILES if profiles is None else profiles)
+        self.preload = preload
+        self.ready = threading.Event()     # set once loaded – or once loading failed
+        self.error = None
+        self._models = {}
+        self._jobs = queue.Queue()
+        self._thread = None
+
+    # ─── lifecycle ─────────────────────────────────────────
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="stt-worker", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._jobs.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _model(self, size):
+        model = self._models.get(size)
+        if model is None:
+            from faster_whisper import WhisperModel
+            model = WhisperModel(size, compute_type=self.compute_type)
+            self._models[size] = model
+        return model
+
+    def wait_ready(self, timeout=None):
+        """Block until the models are warm; re-raises a load failure."""
+        if not self.ready.wait(timeout):
+            raise TimeoutError("STT still loading")
+        if self.error is not None:
+            raise self.error
+
+    def _run(self):
+        started = time.perf_counter()
+        try:
+            for size in self.preload:
+                model = self._model(size)
+                # first decode pays for lazy init inside ctranslate2; do it now
+                segments, _ = model.transcribe(np.zeros(16000, dtype=np.float32),
+                                               beam_size=1, language=self.language)
+                list(segments)
+        except Exception as e:
+            self.error = e
+            self.ready.set()
+            return
+        print(f"✅ STT ready ({', '.join(self.preload)}) in {time.perf_counter() - started:.1f}s")
+        self.ready.set()
+
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            if job.cancelled.is_set():
+                job.loop.call_soon_threadsafe(job.out.put_nowait, _DONE)
+                continue
+            try:
+                options = dict(job.options)
+                model = self._model(options.pop("model"))
+                segments, _ = model.transcribe(job.audio, language=self.language, **options)
+                # the generator decodes lazily, so stopping early really saves work
+                for seg in segments:
+                    if job.cancelled.is_set():
+                        break
+                    job.loop.call_soon_threadsafe(job.out.put_nowait, seg.text)
+            except Exception as e:
+                job.loop.call_soon_threadsafe(job.out.put_nowait, e)
+            job.loop.call_soon_threadsafe(job.out.put_nowait, _DONE)
+
+    # ─── async API ─────────────────────────────────────────
+    async def stream(self, audio, kind="query", **overrides):
+        """Yield text segment by segment as Whisper decodes them."""
+        options = {**self.profiles[kind], **overrides}
+        loop = asyncio.get_running_loop()
+        job = _Job(audio, kind, options, loop, asyncio.Queue())
+        self._jobs.put(job)
+        try:
+            while True:
+                item = await job.out.get()
+                if item is _DONE:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # consumer stopped early or got cancelled – let the worker move on
+            job.cancelled.set()
+
+    async def transcribe(self, audio, kind="query", **overrides):
+        """Full text, lower-cased and stripped, like the old transcribe_audio."""
+        parts = [seg async for seg in self.stream(audio, kind, **overrides)]
+        return " ".join(parts).strip().lower()
+
+
+class TriggerSpotter:
+    """
+    Cheap first pass: greedily decode only the head of an utterance and look
+    for the trigger word near the start. Full beam-search decoding is only
+    worth it when this says yes.
+    """
+
+    def __init__(self, stt, pattern, head_seconds=1.2, sample_rate=16000, first_words=3):
+        self.stt = stt
+        self.pattern = re.compile(rf"\b({pattern})\b")
+        self.head = int(head_seconds * sample_rate)
+        self.first_words = first_words
+        self.checked = 0
+        self.passed = 0
+
+    @property
+    def skipped(self):
+        """Full decodes we didn't have to run."""
+        return self.checked - self.passed
+
+    def stats(self):
+        return {"checked": self.checked, "full_decodes": self.passed, "skipped": self.skipped}
+
+    async def likely(self, audio):
+        self.checked += 1
+        text = await self.stt.transcribe(audio[: self.head], kind="trigger")
+        head = " ".join(re.findall(r"[a-z']+", text)[: self.first_words])
+        if self.pattern.search(head):
+            self.passed += 1
+            return True
+        return False
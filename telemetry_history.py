@@ -0,0 +1,144 @@
+"""
+Fixed-size telemetry history.
+
+Every packet becomes one row of a preallocated structured NumPy array. The
+array is stored twice back to back (a "mirrored" ring) so any window of the
+most recent rows is a plain contiguous slice — appends are O(1) and window
+queries never copy. Memory is allocated once and never grows, no matter how
+long the race runs.
+"""
+from operator import attrgetter
+
+import numpy as np
+
+PACKET_RATE = 60                # GT7 sends telemetry at ~60 Hz
+HISTORY_SECONDS = 12 * 60       # keep a little over 10 minutes
+
+# Column name -> dtype. Names match the gt_telem Telemetry attributes so a
+# row can be filled straight from a packet.
+CHANNELS = [
+    ("packet_id", "i4"),
+    ("current_lap", "i2"),
+    ("total_laps", "i2"),
+    ("race_start_pos", "i2"),
+    ("total_cars", "i2"),
+    ("flags", "i2"),
+    ("throttle", "u1"),
+    ("brake", "u1"),
+    ("best_lap_time_ms", "i4"),
+    ("last_lap_time_ms", "i4"),
+    ("speed_mps", "f4"),
+    ("engine_rpm", "f4"),
+    ("fuel_level", "f4"),
+    ("fuel_capacity", "f4"),
+    ("tire_fl_temp", "f4"),
+    ("tire_fr_temp", "f4"),
+    ("tire_rl_temp", "f4"),
+    ("tire_rr_temp", "f4"),
+    ("oil_pressure", "f4"),
+    ("water_temp", "f4"),
+    ("oil_temp", "f4"),
+    ("position_x", "f4"),
+    ("position_y", "f4"),
+    ("position_z", "f4"),
+]
+
+# "t" is the receive time (time.monotonic()) stamped by TelemetryServer.
+HISTORY_DTYPE = np.dtype([("t", "f8")] + CHANNELS)
+
+_read_channels = attrgetter(*(name for name, _ in CHANNELS))
+
+
+class TelemetryHistory:
+    """
+    Ring buffer of recent packets with windowed, zero-copy queries.
+
+    Returned windows are views into the buffer: they stay valid for roughly
+    `capacity` packets, so copy them if you need to keep them longer.
+    """
+
+    def __init__(self, seconds=HISTORY_SECONDS, rate=PACKET_RATE):
+        self.capacity = int(seconds * rate)
+        self._buf = np.zeros(2 * self.capacity, dtype=HISTORY_DTYPE)
+        self._count = 0
+
+    def __len__(self):
+        return min(self._count, self.capacity)
+
+    @property
+    def nbytes(self):
+        return self._buf.nbytes
+
+    def append(self, t, now):
+        """Store packet `t`, received at monotonic time `now`."""
+        row = (now, *_read_channels(t))
+        i = self._count % self.capacity
+        self._buf[i] = row
+        self._buf[i + self.capacity] = row
+        self._count += 1
+
+    def clear(self):
+        self._count = 0
+
+    # ─── windows ───────────────────────────────────────────
+    def last(self, n=None):
+        """The most recent `n` rows (all of them by default), oldest first."""
+        size = len(self)
+        n = size if n is None else max(0, min(n, size))
+        start = (self._count - n) % self.capacity
+        return self._buf[start:start + n]
+
+    def last_seconds(self, seconds):
+        """Rows received within `seconds` of the newest one."""
+        rows = self.last()
+        if not len(rows):
+            return rows
+        cut = np.searchsorted(rows["t"], rows["t"][-1] - seconds, side="left")
+        return rows[cut:]
+
+    def lap(self, lap):
+        """The most recent unbroken run of rows for lap number `lap`."""
+        rows = self.last()
+        hits = np.flatnonzero(rows["current_lap"] == lap)
+        if not len(hits):
+            return rows[:0]
+        end = hits[-1] + 1
+        others = np.flatnonzero(rows["current_lap"][:end] != lap)
+        start = others[-1] + 1 if len(others) else 0
+        return rows[start:end]
+
+    def current_lap(self):
+        rows = self.last(1)
+        if not len(rows):
+            return rows
+        return self.lap(rows["current_lap"][0])
+
+    # ─── derived stats ─────────────────────────────────────
+    def fuel_per_lap(self, laps=3):
+        """Average fuel burned per completed lap (% of tank), or None."""
+        rows = self.last(1)
+        if not len(rows) or rows["fuel_capacity"][0] <= 0:
+            return None
+        cur = int(rows["current_lap"][0])
+        oldest = self.last()["t"][0] if self._count > self.capacity else None
+        used = []
+        for lap in range(cur - laps, cur):
+            run = self.lap(lap)
+            nxt = self.lap(lap + 1)
+            if lap < 1 or not len(run) or not len(nxt):
+                continue
+            if run["t"][0] == oldest:
+                continue        # start of this lap already fell off the ring
+            burned = run["fuel_level"][0] - nxt["fuel_level"][0]
+            if burned > 0:      # skip laps with a pit stop in them
+                used.append(burned)
+        if not used:
+            return None
+        return float(np.mean(used) / rows["fuel_capacity"][0] * 100)
+
+    def best_lap_before(self, lap):
+        """The best lap time (ms) the game reported while on lap `lap`, or None."""
+        run = self.lap(lap)
+        if not len(run):
+            return None
+        return int(run["best_lap_time_ms"][-1])
@@ -0,0 +1,191 @@
+"""
+Local telemetry fan-out.
+
+One TelemetryServer (one UDP receiver, one TurismoClient) feeds any number
+of local subscribers over TCP — the radio bot, a HUD, a recorder — instead
+of each tool binding its own receiver.
+
+Protocol: connect, send one JSON line choosing a rate and channel set,
+
+    {"rate": 10, "channels": "engineer"}          # or a list of field names
+
+then read newline-delimited JSON packets. `rate` is in Hz (0 = every
+packet). A subscriber that can't keep up is never queued for: each one is
+sent the newest packet whenever its socket has drained, and packets it was
+too slow for are skipped (latest-value coalescing).
+
+    python telemetry_hub.py [--port 33750]
+"""
+import argparse
+import asyncio
+import json
+import threading
+import time
+from operator import attrgetter
+
+from telemetry_snapshot import FIELDS
+
+HUB_HOST = "127.0.0.1"
+HUB_PORT = 33750
+WRITE_BUFFER = 64 * 1024    # per-client socket buffer before we stop writing to it
+
+_MINIMAL = ("packet_id", "current_lap", "total_laps", "race_start_pos", "speed_mps", "fuel_level", "fuel_capacity")
+CHANNEL_SETS = {
+    "minimal": _MINIMAL,
+    "engineer": _MINIMAL + (
+        "total_cars", "flags", "throttle", "brake", "engine_rpm", "best_lap_time_ms", "last_lap_time_ms",
+        "tire_fl_temp", "tire_fr_temp", "tire_rl_temp", "tire_rr_temp",
+        "oil_pressure", "water_temp", "oil_temp", "position_x", "position_y", "position_z",
+    ),
+    "full": FIELDS,
+}
+
+
+class _Channels:
+    """A channel selection with a one-line-per-packet encoder shared by its subscribers."""
+
+    def __init__(self, names):
+        unknown = [n for n in names if n not in FIELDS]
+        if unknown:
+            raise ValueError(f"unknown channels: {', '.join(unknown)}")
+        self.names = tuple(names)
+        self._get = attrgetter(*self.names)
+        self._seq = None
+        self._line = b""
+
+    def encode(self, t):
+        if t.seq != self._seq:
+            values = self._get(t) if len(self.names) > 1 else (self._get(t),)
+            packet = dict(zip(self.names, values), seq=t.seq, received_at=t.received_at)
+            self._line = json.dumps(packet, separators=(",", ":")).encode() + b"\n"
+            self._seq = t.seq
+        return self._line
+
+
+class TelemetryHub:
+    def __init__(self, server, host=HUB_HOST, port=HUB_PORT):
+        self.server = server
+        self.host = host
+        self.port = port
+        self.clients = {}           # peer -> stats dict
+        self._channels = {}         # names tuple -> _Channels
+        self._loop = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    # ─── lifecycle (own thread + event loop) ───────────────
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="telemetry-hub", daemon=True)
+        self._thread.start()
+        self._ready.wait(5)
+        return self
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        try:
+            srv = self._loop.run_until_complete(
+                asyncio.start_server(self._serve, self.host, self.port))
+        except OSError as e:
+            print(f"❌ Telemetry hub could not listen on {self.host}:{self.port}: {e}")
+            self._ready.set()
+            return
+        print(f"📡 Telemetry hub on {self.host}:{self.port}")
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            srv.close()
+
+    def stop(self):
+        if self._loop:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+    # ─── one task per subscriber ───────────────────────────
+    def _select(self, spec):
+        names = CHANNEL_SETS[spec] if isinstance(spec, str) else tuple(spec)
+        channels = self._channels.get(names)
+        if channels is None:
+            channels = self._channels[names] = _Channels(names)
+        return channels
+
+    async def _serve(self, reader, writer):
+        peer = "%s:%s" % writer.get_extra_info("peername")[:2]
+        writer.transport.set_write_buffer_limits(high=WRITE_BUFFER)
+        try:
+            request = json.loads(await asyncio.wait_for(reader.readline(), 5) or b"{}")
+            if not isinstance(request, dict):
+                raise TypeError("expected a JSON object")
+            rate = float(request.get("rate", 0))
+            channels = self._select(request.get("channels", "engineer"))
+        except (asyncio.TimeoutError, ValueError, KeyError, TypeError) as e:
+            writer.write(json.dumps({"error": f"bad subscription: {e}"}).encode() + b"\n")
+            writer.close()
+            return
+
+        stats = self.clients[peer] = {"rate": rate, "channels": len(channels.names), "sent": 0, "skipped": 0}
+        print(f"📡 Hub subscriber {peer}: {f'{rate:g} Hz' if rate else 'every packet'}, {len(channels.names)} channels")
+        interval = 1 / rate if rate > 0 else 0
+        last_seq = 0
+        loop = asyncio.get_running_loop()
+        due = loop.time()
+        try:
+            while not writer.is_closing():
+                t = self.server.get_latest()
+                if t is None or t.seq <= last_seq:
+                    t = await self.server.wait_for_update(timeout=1)
+                    if t is None:
+                        continue
+                if last_seq:
+                    stats["skipped"] += t.seq - last_seq - 1
+                writer.write(channels.encode(t))
+                await writer.drain()        # a slow client only ever holds up itself
+                stats["sent"] += 1
+                last_seq = t.seq
+                if interval:
+                    due = max(due + interval, loop.time())
+                    await asyncio.sleep(due - loop.time())
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self.clients.pop(peer, None)
+            writer.close()
+            print(f"📡 Hub subscriber {peer} left ({stats['sent']} sent, {stats['skipped']} coalesced)")
+
+
+def read_hub(host=HUB_HOST, port=HUB_PORT, rate=0, channels="full"):
+    """Blocking client: yield packets (dicts) from a running hub."""
+    import socket
+    with socket.create_connection((host, port)) as sock:
+        sock.sendall(json.dumps({"rate": rate, "channels": channels}).encode() + b"\n")
+        for line in sock.makefile("rb"):
+            yield json.loads(line)
+
+
+def main():
+    from telemetry_server import TelemetryServer
+
+    parser = argparse.ArgumentParser(description="Serve GT7 telemetry to local subscribers.")
+    parser.add_argument("--host", default=HUB_HOST)
+    parser.add_argument("--port", type=int, default=HUB_PORT)
+    args = parser.parse_args()
+
+    server = TelemetryServer()
+    server.start()
+    if not server.running:
+        return
+    hub = TelemetryHub(server, args.host, args.port).start()
+    try:
+        while True:
+            time.sleep(10)
+            if hub.clients:
+                print(f"📡 {len(hub.clients)} subscriber(s): {hub.clients}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        hub.stop()
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+Binary telemetry session recorder.
+
+Every packet the engineer sees is appended to a session file as one
+fixed-width record (the same row layout as TelemetryHistory, so
+HISTORY_DTYPE.itemsize bytes each – under 100), and an hour at 60 Hz stays
+around 20 MB. The file starts with a fixed-size header
+holding JSON session metadata and the record dtype, followed by the raw
+records — readers memory-map it and slice any channel without loading the
+rest.
+
+The receive thread only copies the packet into a preallocated block; full
+blocks (and a partial one every FLUSH_EVERY seconds) are written by a
+background thread, so packet handling never waits on the disk.
+"""
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from operator import attrgetter
+
+import numpy as np
+
+from telemetry_history import CHANNELS, HISTORY_DTYPE
+
+MAGIC = b"GT7REC01"
+HEADER_SIZE = 4096          # page-sized, so the records start page-aligned
+BLOCK_ROWS = 256            # ~4 s of packets per write
+FLUSH_EVERY = 1.0           # seconds before a partial block is written anyway
+
+_read_channels = attrgetter(*(name for name, _ in CHANNELS))
+
+
+def _pack_header(meta):
+    body = json.dumps(meta).encode("utf-8")
+    if len(MAGIC) + 4 + len(body) > HEADER_SIZE:
+        raise ValueError("session metadata too large for the header")
+    head = MAGIC + len(body).to_bytes(4, "little") + body
+    return head.ljust(HEADER_SIZE, b"\0")
+
+
+def _unpack_header(raw):
+    if raw[:len(MAGIC)] != MAGIC:
+        raise ValueError("not a GT7 telemetry session")
+    n = int.from_bytes(raw[len(MAGIC):len(MAGIC) + 4], "little")
+    return json.loads(raw[len(MAGIC) + 4:len(MAGIC) + 4 + n])
+
+
+class SessionRecorder:
+    """
+    Append-only writer for one session file.
+
+    Subscribe `on_packet` to a TelemetryServer (or call `attach`), and
+    `close()` when the session is over.
+    """
+
+    def __init__(self, path, **metadata):
+        self.path = path
+        self.meta = {
+            "version": 1,
+            "dtype": HISTORY_DTYPE.descr,
+            "started": datetime.now().isoformat(timespec="seconds"),
+            # "t" is time.monotonic(); this pair maps it back to wall time
+            "wall_at_start": time.time(),
+            "mono_at_start": time.monotonic(),
+            **metadata,
+        }
+        self.records = 0
+        self.dropped = 0
+        self._server = None
+        self._block = np.zeros(BLOCK_ROWS, dtype=HISTORY_DTYPE)
+        self._fill = 0
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._pending = queue.Queue()
+        self._file = open(path, "wb")
+        self._file.write(_pack_header(self.meta))
+        self._writer = threading.Thread(target=self._write_loop, name="telemetry-recorder", daemon=True)
+        self._writer.start()
+
+    @classmethod
+    def new_session(cls, directory, **metadata):
+        """Open a recorder on a fresh, timestamped file in `directory`."""
+        os.makedirs(directory, exist_ok=True)
+        name = datetime.now().strftime("session_%Y%m%d_%H%M%S.gt7rec")
+        return cls(os.path.join(directory, name), **metadata)
+
+    def attach(self, server):
+        self._server = server
+        server.subscribe(self.on_packet)
+        return self
+
+    # ─── receive thread ────────────────────────────────────
+    def on_packet(self, t):
+        """Copy one packet into the current block. Never touches the disk."""
+        with self._lock:
+            if self._closed:
+                return
+            self._block[self._fill] = (t.received_at, *_read_channels(t))
+            self._fill += 1
+            if self._fill == BLOCK_ROWS or t.received_at - self._last_flush >= FLUSH_EVERY:
+                self._hand_off(t.received_at)
+
+    def _hand_off(self, now):
+        # caller holds the lock
+        if self._fill:
+            self._pending.put(self._block[:self._fill])
+            self._block = np.zeros(BLOCK_ROWS, dtype=HISTORY_DTYPE)
+            self._fill = 0
+        self._last_flush = now
+
+    # ─── writer thread ─────────────────────────────────────
+    def _write_loop(self):
+        while True:
+            block = self._pending.get()
+            if block is None:
+                return
+            try:
+                self._file.write(block.tobytes())
+                self._file.flush()
+                self.records += len(block)
+            except (OSError, ValueError) as e:
+                self.dropped += len(block)
+                print(f"❌ Telemetry recorder write failed: {e}")
+
+    def close(self):
+        """Write what is left, record the final count in the header, close the file."""
+        if self._server is not None:
+            self._server.unsubscribe(self.on_packet)
+            self._server = None
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._hand_off(time.monotonic())
+            self._pending.put(None)
+        self._writer.join()
+        with self._lock:
+            self.meta["ended"] = datetime.now().isoformat(timespec="seconds")
+            self.meta["records"] = self.records
+            self._file.seek(0)
+            self._file.write(_pack_header(self.meta))
+            self._file.close()
+            self._file = None
+        print(f"💾 Recorded {self.records} packets to {self.path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class RecordedSession:
+    """
+    Read-only, memory-mapped view of a session file.
+
+    `session["speed_mps"]` is a strided view over the file — nothing is read
+    until it is used. Works on files that are still being written (only whole
+    records are mapped).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self.meta = _unpack_header(f.read(HEADER_SIZE))
+        self.dtype = np.dtype([tuple(field) for field in self.meta["dtype"]])
+        count = (os.path.getsize(path) - HEADER_SIZE) // self.dtype.itemsize
+        if count > 0:
+            self.records = np.memmap(path, dtype=self.dtype, mode="r", offset=HEADER_SIZE, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=self.dtype)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, key):
+        return self.records[key]
+
+    @property
+    def channels(self):
+        return self.dtype.names
+
+    @property
+    def duration(self):
+        if len(self.records) < 2:
+            return 0.0
+        return float(self.records["t"][-1] - self.records["t"][0])
+
+    def wall_time(self, t):
+        """Monotonic receive time(s) -> Unix time."""
+        return self.meta["wall_at_start"] + (t - self.meta["mono_at_start"])
+
+    def lap(self, n):
+        """Records of lap `n`, as a view (laps are contiguous in a session)."""
+        idx = np.flatnonzero(self.records["current_lap"] == n)
+        if not len(idx):
+            return self.records[:0]
+        return self.records[idx[0]:idx[-1] + 1]
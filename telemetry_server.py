@@ -1,42 +1,212 @@
-import time
+import asyncio
+import json
+import socket
 import threading
+import time
+from types import SimpleNamespace
 from gt_telem import TurismoClient
 from gt_telem.errors.playstation_errors import PlayStationNotFoundError, PlayStatonOnStandbyError
+from telemetry_history import TelemetryHistory
+from telemetry_snapshot import TelemetrySnapshot
+
+# gt_telem fires its callbacks from a thread pool, so two packets can land
+# slightly out of order. Anything this far behind the newest id is a straggler.
+REORDER_WINDOW = 60
+
+# No packet for this long means the UDP stream is dead (GT7 sends ~60 Hz).
+STALE_AFTER = 2.0
+
 
 class TelemetryServer:
     def __init__(self):
         self.tc = None
-        self.latest = None
+        self.latest = None      # TelemetrySnapshot of the newest packet
+        self.seq = 0
+        self.history = TelemetryHistory()
         self.running = False
-        self.thread = None
+        self._lock = threading.Lock()
+        self._first_packet = threading.Event()
+        self._callbacks = []
+        self._waiters = []      # [key, baseline, loop, future]
+        self._hub = None        # socket, when fed by a telemetry_hub instead of UDP
+        self.hub_refused = False    # the hub turned us away: use UDP from now on
 
-    def _loop(self):
-        while self.running:
-            if self.tc.telemetry:
-                self.latest = self.tc.telemetry
-            time.sleep(0.05)
+    # ─── packet arrival (gt_telem callback thread) ─────────
+    @staticmethod
+    def _on_packet(t, self):
+        with self._lock:
+            if not self.running:
+                return
+            prev = self.latest
+            if prev is not None:
+                behind = prev.packet_id - t.packet_id
+                if 0 <= behind < REORDER_WINDOW:
+                    return      # same packet again, or a late straggler
+            self.seq += 1
+            t = TelemetrySnapshot.from_packet(t, self.seq, time.monotonic())
+            self.latest = t
+            self.history.append(t, t.received_at)
+            callbacks = list(self._callbacks)
+            ready = []
+            for waiter in self._waiters:
+                key, baseline, loop, fut = waiter
+                if key is None or key(t) != baseline:
+                    ready.append(waiter)
+            for waiter in ready:
+                self._waiters.remove(waiter)
+
+        self._first_packet.set()
+        for _, _, loop, fut in ready:
+            loop.call_soon_threadsafe(_resolve, fut, t)
+        for cb in callbacks:
+            try:
+                cb(t)
+            except Exception as e:
+                print(f"❌ Telemetry callback {cb} failed: {e}")
 
     def start(self):
         try:
             self.tc = TurismoClient()
+            self.tc.register_callback(TelemetryServer._on_packet, [self])
+            self.running = True
             self.tc.start()
             print("✅ Telemetry started.")
         except PlayStatonOnStandbyError:
             print("❗ PS5 is asleep—wake it up.")
+            self.running = False
             return
         except PlayStationNotFoundError:
             print("❗ PS5 not found on LAN.")
+            self.running = False
             return
 
+    def start_from_hub(self, host, port):
+        """Take packets from a running telemetry_hub instead of opening our own UDP receiver."""
+        if self.hub_refused:
+            if not self.running:
+                self.start()
+            return
+        if self._hub:
+            self._hub.close()   # a retry: drop the previous connection
+        try:
+            self._hub = socket.create_connection((host, port), timeout=2)
+        except OSError as e:
+            print(f"❗ Telemetry hub not reachable at {host}:{port}: {e}")
+            self.running = False
+            return
+        self._hub.settimeout(None)
+        self._hub.sendall(b'{"rate": 0, "channels": "full"}\n')
         self.running = True
-        self.thread = threading.Thread(target=self._loop, daemon=True)
-        self.thread.start()
+        threading.Thread(target=self._read_hub, args=(self._hub,), name="telemetry-hub-client", daemon=True).start()
+        print(f"✅ Telemetry from hub {host}:{port}.")
+
+    def _read_hub(self, sock):
+        try:
+            for line in sock.makefile("rb"):
+                frame = json.loads(line)
+                if not isinstance(frame, dict) or "error" in frame:
+                    problem = frame["error"] if isinstance(frame, dict) else f"unexpected frame {line[:80]!r}"
+                    print(f"❗ Telemetry hub refused us: {problem} – falling back to direct UDP")
+                    self._fall_back_to_udp(sock)
+                    return
+                TelemetryServer._on_packet(SimpleNamespace(**frame), self)
+        except (OSError, ValueError) as e:
+            if self.running:
+                print(f"❌ Telemetry hub connection lost: {e}")
+
+    def _fall_back_to_udp(self, sock):
+        self.hub_refused = True
+        self.running = False
+        sock.close()
+        if self._hub is sock:
+            self._hub = None
+        self.start()
 
     def stop(self):
         self.running = False
         if self.tc:
             self.tc.stop()
+        if self._hub:
+            self._hub.close()
+        with self._lock:
+            waiters, self._waiters = self._waiters, []
+        for _, _, loop, fut in waiters:
+            loop.call_soon_threadsafe(_resolve, fut, None)
         print("🛑 Telemetry stopped.")
 
     def get_latest(self):
-        return self.latest
\ No newline at end of file
+        """The newest packet as an immutable TelemetrySnapshot (None before the first)."""
+        return self.latest
+
+    def is_stale(self, max_age=STALE_AFTER):
+        """True if nothing has arrived for `max_age` seconds (or ever)."""
+        t = self.latest
+        return t is None or t.is_stale(max_age)
+
+    # ─── subscriptions ─────────────────────────────────────
+    def subscribe(self, callback):
+        """Call `callback(t)` on the receive thread for every new packet.
+
+        Keep it short — it runs inline with packet handling.
+        """
+        with self._lock:
+            self._callbacks.append(callback)
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def wait_for_packet(self, timeout=None):
+        """Block until the first packet has arrived. Returns False on timeout."""
+        return self._first_packet.wait(timeout)
+
+    async def wait_for_update(self, key=None, timeout=None, since=None):
+        """
+        Wait for the next packet and return it (None on timeout / stop).
+
+        With `key`, only wake once `key(packet)` differs from its value for the
+        packet we have now — the check runs on the receive thread, so the event
+        loop sleeps until something it cares about actually changes.
+
+        `since` is the snapshot the caller last looked at: compare against
+        that instead, and return at once if a newer packet already differs,
+        so changes that landed while the caller was busy aren't missed.
+        """
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        with self._lock:
+            latest = self.latest
+            seen = since if since is not None else latest
+            if latest is not None and since is not None and latest.seq > since.seq:
+                if key is None or key(latest) != key(since):
+                    return latest
+            if key is not None and seen is None:
+                key_fn = None   # nothing to compare against yet, any packet will do
+            else:
+                key_fn = key
+            baseline = key(seen) if key_fn else None
+            waiter = [key_fn, baseline, loop, fut]
+            self._waiters.append(waiter)
+        try:
+            return await asyncio.wait_for(fut, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+
+    async def updates(self, key=None):
+        """Async iterator over new packets (coalesced if the consumer lags)."""
+        last = None
+        while self.running:
+            t = await self.wait_for_update(key=key, since=last)
+            if t is not None:
+                last = t
+                yield t
+
+
+def _resolve(fut, value):
+    if not fut.done():
+        fut.set_result(value)
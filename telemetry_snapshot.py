@@ -0,0 +1,105 @@
+"""
+Immutable per-packet telemetry snapshots.
+
+gt_telem hands us a full Telemetry object (~100 fields) per packet. The
+engineer only reads a couple of dozen of them, and must never see half of
+one packet and half of the next, so TelemetryServer copies just those fields
+into a frozen, slotted snapshot once per new packet and publishes that.
+"""
+import time
+from operator import attrgetter
+
+# Fields copied from the gt_telem packet, same names as gt_telem uses.
+FIELDS = (
+    "packet_id",
+    "current_lap",
+    "total_laps",
+    "race_start_pos",
+    "total_cars",
+    "flags",
+    "throttle",
+    "brake",
+    "best_lap_time_ms",
+    "last_lap_time_ms",
+    "speed_mps",
+    "engine_rpm",
+    "fuel_level",
+    "fuel_capacity",
+    "tire_fl_temp",
+    "tire_fr_temp",
+    "tire_rl_temp",
+    "tire_rr_temp",
+    "oil_pressure",
+    "water_temp",
+    "oil_temp",
+    "position_x",
+    "position_y",
+    "position_z",
+    "bits",             # gear (low nibble) and suggested gear – for hub subscribers like the bridge
+)
+
+_read_fields = attrgetter(*FIELDS)
+_set = object.__setattr__
+
+
+class TelemetrySnapshot:
+    """One packet's worth of the fields the engineer uses. Read-only."""
+
+    __slots__ = FIELDS + ("seq", "received_at")
+
+    def __init__(self, seq, received_at, **fields):
+        _set(self, "seq", seq)
+        _set(self, "received_at", received_at)
+        for name in FIELDS:
+            _set(self, name, fields.get(name, 0))
+
+    @classmethod
+    def from_packet(cls, t, seq, received_at=None):
+        snap = cls.__new__(cls)
+        _set(snap, "seq", seq)
+        _set(snap, "received_at", time.monotonic() if received_at is None else received_at)
+        for name, value in zip(FIELDS, _read_fields(t)):
+            _set(snap, name, value)
+        return snap
+
+    def __setattr__(self, name, value):
+        raise AttributeError("TelemetrySnapshot is read-only")
+
+    def __delattr__(self, name):
+        raise AttributeError("TelemetrySnapshot is read-only")
+
+    def __repr__(self):
+        return (f"TelemetrySnapshot(seq={self.seq}, packet_id={self.packet_id}, "
+                f"lap={self.current_lap}/{self.total_laps}, pos={self.race_start_pos})")
+
+    # ─── staleness ─────────────────────────────────────────
+    @property
+    def age(self):
+        """Seconds since this packet was received."""
+        return time.monotonic() - self.received_at
+
+    def is_stale(self, max_age):
+        return self.age > max_age
+
+    # ─── same helpers gt_telem's Telemetry offers ──────────
+    @property
+    def cars_on_track(self):
+        return bool(1 << 0 & self.flags)
+
+    @property
+    def is_paused(self):
+        return bool(1 << 1 & self.flags)
+
+    @property
+    def is_loading(self):
+        return bool(1 << 2 & self.flags)
+
+    @property
+    def speed_kph(self):
+        return self.speed_mps * 3.6
+
+    @property
+    def fuel_pct(self):
+        if self.fuel_capacity <= 0:
+            return 100.0
+        return self.fuel_level / self.fuel_capacity * 100
@@ -0,0 +1,266 @@
+"""
+Coqui TTS in long-lived worker processes.
+
+Each worker is a separate `python tts_worker.py` process that loads the model
+once, speaks a warm-up line, then synthesizes requests from its stdin and
+writes float32 PCM back on its stdout. Running TTS out of process keeps the
+event loop (voice receive, telemetry reactions) free while a line renders,
+and makes timeouts real: a request that overruns (or whose worker died)
+gets its worker killed and respawned instead of running to completion in
+the background. The replacement loads and warms up off to the side,
+outside any request's timeout, and only rejoins the pool once it is ready.
+An error the worker reports itself (text it can't say) leaves it running.
+Requests carry an id the worker echoes, and each one only ever talks to
+the process it started on, so a timed-out call can't eat a reply meant
+for the replacement.
+
+Running a plain subprocess (not multiprocessing) means the child never
+re-imports the launcher / bot module.
+"""
+import asyncio
+import itertools
+import json
+import os
+import struct
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+
+DEFAULT_MODEL = "tts_models/en/vctk/vits"
+_HEADER = struct.Struct("<II")     # json length, payload length
+
+
+class TtsWorkerError(RuntimeError):
+    pass
+
+
+class TtsWorkerLost(TtsWorkerError):
+    """The worker process died or its pipe broke – it needs replacing."""
+
+
+# ─── wire format ───────────────────────────────────────────
+def _send(stream, meta, payload=b""):
+    body = json.dumps(meta).encode("utf-8")
+    stream.write(_HEADER.pack(len(body), len(payload)) + body + payload)
+    stream.flush()
+
+
+def _read_exact(stream, n):
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = stream.read(n - len(buf))
+        if not chunk:
+            raise EOFError("TTS worker pipe closed")
+        buf += chunk
+    return bytes(buf)
+
+
+def _recv(stream):
+    n_meta, n_payload = _HEADER.unpack(_read_exact(stream, _HEADER.size))
+    meta = json.loads(_read_exact(stream, n_meta))
+    payload = _read_exact(stream, n_payload) if n_payload else b""
+    return meta, payload
+
+
+# ─── parent side ───────────────────────────────────────────
+class _Worker:
+    def __init__(self, index, model_name, speaker):
+        self.index = index
+        self.model_name = model_name
+        self.speaker = speaker
+        self.proc = None
+        self.ready = threading.Event()
+        self.info = {}
+        self._ready_lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def spawn(self):
+        self.ready.clear()
+        self.proc = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), self.model_name, self.speaker],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+
+    def kill(self):
+        if self.proc and self.proc.poll() is None:
+            self.proc.kill()
+        self.proc = None
+
+    def wait_ready(self, proc=None):
+        """Block until the worker has loaded and warmed up its model."""
+        proc = proc or self.proc
+        with self._ready_lock:
+            if proc is not self.proc:
+                raise TtsWorkerLost("TTS worker was replaced")
+            if not self.ready.is_set():
+                try:
+                    meta, _ = _recv(proc.stdout)
+                except (EOFError, OSError, ValueError) as e:
+                    raise TtsWorkerLost(f"TTS worker died while loading: {e!r}") from e
+                if "error" in meta:
+                    raise TtsWorkerLost(meta["error"])     # it exits after a failed start
+                self.info = meta
+                self.ready.set()
+        return self.info
+
+    def request(self, text, speaker):
+        """Blocking round trip – run it in an executor thread."""
+        proc = self.proc        # stick to this process, even if it gets replaced meanwhile
+        if proc is None:
+            raise TtsWorkerLost("TTS worker is not running")
+        self.wait_ready(proc)
+        request_id = next(self._ids)
+        try:
+            _send(proc.stdin, {"id": request_id, "text": text, "speaker": speaker})
+            meta, payload = _recv(proc.stdout)
+        except (EOFError, OSError, ValueError) as e:
+            raise TtsWorkerLost(f"TTS worker pipe broke: {e!r}") from e
+        if meta.get("id") != request_id:
+            raise TtsWorkerLost(f"TTS worker out of sync (reply {meta.get('id')}, wanted {request_id})")
+        if "error" in meta:
+            raise TtsWorkerError(meta["error"])
+        return np.frombuffer(payload, dtype=np.float32), meta["sample_rate"], meta["synth_s"]
+
+
+class TtsWorkerPool:
+    def __init__(self, model_name=DEFAULT_MODEL, speaker="p226", workers=1):
+        self.model_name = model_name
+        self.speaker = speaker
+        self._workers = [_Worker(i, model_name, speaker) for i in range(workers)]
+        self._idle = None           # asyncio.Queue, created on the running loop
+        self._respawning = set()    # tasks warming up replacement workers
+        self.waiting = 0
+        self.requests = 0
+        self.timeouts = 0
+        self.failures = 0
+        self.last_ms = 0.0
+        self.max_ms = 0.0
+        self._total_ms = 0.0
+
+    def start(self):
+        for w in self._workers:
+            w.spawn()
+        return self
+
+    def stop(self):
+        for w in self._workers:
+            w.kill()
+
+    def wait_ready(self, timeout=None):
+        """Block until every worker is warm (e.g. for a startup report)."""
+        threads = [threading.Thread(target=w.wait_ready, daemon=True) for w in self._workers]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout)
+        return all(w.ready.is_set() for w in self._workers)
+
+    async def synthesize(self, text, speaker=None, timeout=10.0):
+        """Return (float32 samples, sample_rate). Raises TimeoutError / TtsWorkerError."""
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+            for w in self._workers:
+                self._idle.put_nowait(w)
+        loop = asyncio.get_running_loop()
+        self.waiting += 1
+        try:
+            worker = await self._idle.get()
+        finally:
+            self.waiting -= 1
+        try:
+            wav, rate, synth_s = await asyncio.wait_for(
+                loop.run_in_executor(None, worker.request, text, speaker or self.speaker),
+                timeout,
+            )
+        except TtsWorkerError as e:
+            self.failures += 1
+            if isinstance(e, TtsWorkerLost):
+                self._respawning.add(asyncio.ensure_future(self._respawn(worker)))
+            else:
+                self._idle.put_nowait(worker)       # it said so itself – still healthy
+            raise
+        except BaseException as e:
+            # timed out, cancelled or something unexpected: the worker's state is unknown – replace it
+            if isinstance(e, asyncio.TimeoutError):
+                self.timeouts += 1
+            elif not isinstance(e, asyncio.CancelledError):
+                self.failures += 1
+            self._respawning.add(asyncio.ensure_future(self._respawn(worker)))
+            raise
+        self._idle.put_nowait(worker)
+        ms = synth_s * 1000
+        self.requests += 1
+        self.last_ms = ms
+        self.max_ms = max(self.max_ms, ms)
+        self._total_ms += ms
+        return wav, rate
+
+    async def _respawn(self, worker):
+        """Replace a worker and hand it back to the pool once its model is warm."""
+        loop = asyncio.get_running_loop()
+        try:
+            worker.kill()
+            worker.spawn()
+            await loop.run_in_executor(None, worker.wait_ready)
+        except Exception as e:
+            # back in the pool regardless: its next request fails fast and respawns it again
+            self.failures += 1
+            print(f"❌ TTS worker {worker.index} failed to restart: {e!r}")
+        finally:
+            self._respawning.discard(asyncio.current_task())
+            self._idle.put_nowait(worker)
+
+    def stats(self):
+        return {
+            "workers": len(self._workers),
+            "respawning": len(self._respawning),
+            "queue_depth": self.waiting,
+            "requests": self.requests,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+            "last_ms": round(self.last_ms),
+            "avg_ms": round(self._total_ms / self.requests) if self.requests else 0,
+            "max_ms": round(self.max_ms),
+        }
+
+
+# ─── worker process ────────────────────────────────────────
+def _worker_main(model_name, speaker):
+    proto_in = sys.stdin.buffer
+    proto_out = os.fdopen(os.dup(1), "wb")
+    os.dup2(2, 1)       # Coqui prints to stdout – keep that off our protocol pipe
+
+    try:
+        started = time.perf_counter()
+        from TTS.api import TTS
+        tts = TTS(model_name=model_name)
+        loaded = time.perf_counter()
+        tts.tts(text="Radio check.", speaker=speaker)
+        warm = time.perf_counter()
+    except Exception as e:
+        _send(proto_out, {"error": f"TTS worker failed to start: {e}"})
+        return
+    rate = tts.synthesizer.output_sample_rate
+    _send(proto_out, {"ready": True, "load_s": loaded - started, "warmup_s": warm - loaded})
+
+    while True:
+        try:
+            msg, _ = _recv(proto_in)
+        except EOFError:
+            return
+        try:
+            started = time.perf_counter()
+            wav = np.asarray(tts.tts(text=msg["text"], speaker=msg.get("speaker") or speaker),
+                             dtype=np.float32)
+            _send(proto_out, {"id": msg.get("id"), "sample_rate": rate,
+                              "synth_s": time.perf_counter() - started}, wav.tobytes())
+        except Exception as e:
+            _send(proto_out, {"id": msg.get("id"), "error": str(e)})
+
+
+if __name__ == "__main__":
+    _worker_main(sys.argv[1], sys.argv[2])
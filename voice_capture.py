@@ -0,0 +1,194 @@
+"""
+Streaming driver voice capture.
+
+UtteranceSink is a discord-ext-voice-recv AudioSink that stays attached for
+the whole session. Incoming 20 ms Discord frames (48 kHz stereo s16) are
+downmixed to 16 kHz mono float32 — what Whisper wants — and written into an
+in-memory ring. A small energy VAD with an adaptive noise floor decides where
+speech starts and ends; each finished utterance is copied out of the ring and
+queued for STT the moment the driver stops talking.
+"""
+import asyncio
+import threading
+import time
+
+import numpy as np
+from discord.ext import voice_recv
+
+SAMPLE_RATE = 16000
+FRAME_MS = 20
+FRAME_SAMPLES = SAMPLE_RATE * FRAME_MS // 1000
+
+
+class Utterance:
+    """One chunk of driver speech: 16 kHz mono float32 PCM plus timing."""
+
+    __slots__ = ("pcm", "user", "started_at", "ended_at", "cut_at")
+
+    def __init__(self, pcm, user, started_at, ended_at, cut_at):
+        self.pcm = pcm
+        self.user = user
+        self.started_at = started_at    # monotonic time of first voiced frame
+        self.ended_at = ended_at        # monotonic time of last voiced frame
+        self.cut_at = cut_at            # when the VAD decided it was over
+
+    @property
+    def duration(self):
+        return len(self.pcm) / SAMPLE_RATE
+
+
+def discord_pcm_to_mono16k(pcm):
+    """48 kHz stereo int16 bytes -> 16 kHz mono float32 in [-1, 1]."""
+    x = np.frombuffer(pcm, dtype=np.int16)
+    x = x[: len(x) - len(x) % 6].reshape(-1, 6).astype(np.float32)
+    # average both channels of 3 consecutive samples: downmix + crude 3:1 decimation
+    return x.mean(axis=1) / 32768.0
+
+
+class UtteranceSink(voice_recv.AudioSink):
+    """
+    Keep listening forever, hand out one Utterance per spoken phrase.
+
+    `user_id` restricts capture to the driver; by default everyone in the
+    channel is treated as one stream.
+    """
+
+    def __init__(self, loop=None, user_id=None, silence_ms=600, preroll_ms=300,
+                 start_ms=60, min_speech_ms=250, max_utterance_s=20,
+                 margin_db=12.0, min_db=-50.0, queue_size=4):
+        super().__init__()
+        self.loop = loop or asyncio.get_event_loop()
+        self.user_id = user_id
+        self.silence_frames = silence_ms // FRAME_MS
+        self.preroll = preroll_ms * SAMPLE_RATE // 1000
+        self.start_frames = max(1, start_ms // FRAME_MS)
+        self.min_speech = min_speech_ms * SAMPLE_RATE // 1000
+        self.max_samples = int(max_utterance_s * SAMPLE_RATE)
+        self.margin_db = margin_db
+        self.min_db = min_db
+
+        # ring holds one max-length utterance plus its pre-roll
+        self._ring = np.zeros(self.max_samples + self.preroll + FRAME_SAMPLES * 4, dtype=np.float32)
+        self._total = 0                 # samples ever written
+        self._lock = threading.Lock()
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.reset()
+
+    def reset(self):
+        """Forget any half-heard speech (e.g. when the radio is muted)."""
+        with self._lock:
+            self._speaking = False
+            self._start = 0
+            self._voiced_run = 0
+            self._silent_run = 0
+            self._speech_started_at = 0.0
+            self._last_voiced_at = 0.0
+            self._voiced_samples = 0
+            self._last_frame_at = 0.0
+            self._user = None
+            self._floor_db = -60.0
+        while not self.queue.empty():
+            self.queue.get_nowait()
+
+    # ─── voice_recv.AudioSink ──────────────────────────────
+    def wants_opus(self):
+        return False
+
+    def write(self, user, data):
+        if self.user_id is not None and (user is None or user.id != self.user_id):
+            return
+        if not data.pcm:
+            return
+        frame = discord_pcm_to_mono16k(data.pcm)
+        now = time.monotonic()
+        with self._lock:
+            self._push(frame)
+            self._last_frame_at = now
+            self._vad(frame, user, now)
+
+    def cleanup(self):
+        self.reset()
+
+    # ─── ring + VAD (call with lock held) ──────────────────
+    def _push(self, frame):
+        n = len(frame)
+        size = len(self._ring)
+        i = self._total % size
+        first = min(n, size - i)
+        self._ring[i:i + first] = frame[:first]
+        self._ring[:n - first] = frame[first:]
+        self._total += n
+
+    def _vad(self, frame, user, now):
+        rms = float(np.sqrt(np.mean(frame * frame)))
+        db = 20 * np.log10(rms + 1e-9)
+        voiced = db > max(self._floor_db + self.margin_db, self.min_db)
+
+        if not self._speaking:
+            # follow quiet levels quickly, loud ones slowly
+            if db < self._floor_db:
+                self._floor_db = db
+            else:
+                self._floor_db += 0.01 * (db - self._floor_db)
+            self._voiced_run = self._voiced_run + 1 if voiced else 0
+            if self._voiced_run >= self.start_frames:
+                self._speaking = True
+                self._silent_run = 0
+                self._user = user
+                self._speech_started_at = now
+                self._last_voiced_at = now
+                self._voiced_samples = self._voiced_run * len(frame)
+                self._start = max(0, self._total - self._voiced_run * len(frame) - self.preroll)
+            return
+
+        if voiced:
+            self._silent_run = 0
+            self._last_voiced_at = now
+            self._voiced_samples += len(frame)
+        else:
+            self._silent_run += 1
+        if self._silent_run >= self.silence_frames or self._total - self._start >= self.max_samples:
+            # keep a third of the trailing silence so word endings aren't clipped
+            tail = self._silent_run * len(frame) * 2 // 3
+            self._cut(self._total - tail, now)
+
+    def _cut(self, end, now):
+        start = max(self._start, end - self.max_samples)
+        self._speaking = False
+        self._voiced_run = 0
+        self._silent_run = 0
+        if self._voiced_samples < self.min_speech:
+            return      # a click or a cough, not a question
+        size = len(self._ring)
+        idx = np.arange(start, end) % size
+        utt = Utterance(self._ring[idx], self._user, self._speech_started_at,
+                        self._last_voiced_at, now)
+        self.loop.call_soon_threadsafe(self._enqueue, utt)
+
+    def _enqueue(self, utt):
+        if self.queue.full():
+            self.queue.get_nowait()     # drop the oldest, the driver has moved on
+        self.queue.put_nowait(utt)
+
+    def _flush_if_idle(self):
+        # Discord stops sending frames while nobody talks, so trailing
+        # silence may never arrive as audio — close the utterance on a timer.
+        now = time.monotonic()
+        with self._lock:
+            idle = now - self._last_frame_at
+            if self._speaking and idle >= self.silence_frames * FRAME_MS / 1000:
+                self._cut(self._total, now)
+
+    # ─── consumer side ─────────────────────────────────────
+    async def next_utterance(self, timeout=None):
+        """Wait for the next finished utterance (None on timeout)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        poll = self.silence_frames * FRAME_MS / 2000
+        while True:
+            wait = poll if deadline is None else min(poll, deadline - time.monotonic())
+            if wait <= 0:
+                return None
+            try:
+                return await asyncio.wait_for(self.queue.get(), wait)
+            except asyncio.TimeoutError:
+                self._flush_if_idle()